@@ -5,11 +5,12 @@ Removes Source and Type tags, replaces with thematic tags.
 Updates manifest.json, post HTML files, and blog.html.
 """
 
-import json
 import re
-import html as html_lib
+from functools import lru_cache
 from pathlib import Path
 
+from manifest_io import dump_manifest, load_manifest
+
 ROOT = Path(__file__).resolve().parent.parent
 MANIFEST = ROOT / "manifest.json"
 POSTS_DIR = ROOT / "posts"
@@ -76,47 +77,93 @@ THEME_COLORS = {
     "Work": "bg-purple-100 text-purple-800",
 }
 
+# Rendered theme tags, built once: px-2 py-1 for post pages, py-0.5 for blog cards
+_POST_THEME_SPAN = {
+    theme: f'<span class="{color} px-2 py-1 rounded">{theme}</span>'
+    for theme, color in THEME_COLORS.items()
+}
+_CARD_THEME_SPAN = {
+    theme: f'<span class="{color} px-2 py-0.5 rounded">{theme}</span>'
+    for theme, color in THEME_COLORS.items()
+}
+
+# All THEME_MAP keys as one alternation, so a title is scanned once
+_THEME_KEY_RE = re.compile('|'.join(re.escape(key) for key in THEME_MAP))
+
+# A post's metadata div (groups 1-3) or its View Original TXT link, so both
+# edits in update_post_html happen in a single pass over the file
+_META_OR_TXT_LINK_RE = re.compile(
+    r'(<div class="flex flex-wrap gap-3 text-sm text-gray-600 mb-4">)\s*(.*?)\s*(</div>)'
+    r'|\s*<a href="https://rickover-corpus\.s3\.us-east-1\.amazonaws\.com/[^"]+\.txt"[^>]*>View Original TXT</a>',
+    re.DOTALL
+)
+
+# One card in blog.html; filled in with str.format_map per post
+_CARD_TEMPLATE = (
+    '      <a href="{blog_page}" class="block bg-white border border-gray-200 rounded-lg p-5 shadow-sm hover:shadow-md transition-shadow no-underline" data-title="{title}" data-summary="{summary}" data-year="{year}" data-themes="{themes_csv}">\n'
+    '        <div class="flex items-start justify-between mb-2">\n'
+    '          <h2 class="text-lg font-semibold text-gray-900" style="text-decoration:none">{title}</h2>\n'
+    '        </div>\n'
+    '        <div class="flex flex-wrap gap-2 mb-3 text-sm">\n'
+    '          <span class="bg-gray-200 px-2 py-0.5 rounded text-gray-700">{year}</span>{theme_spans}\n'
+    '        </div>\n'
+    '        <p class="text-sm text-gray-600 leading-relaxed" style="text-decoration:none">{preview}</p>\n'
+    '      </a>'
+)
+
+# Same output as html.escape(quote=True), in a single pass over the text
+_HTML_ESCAPE_TABLE = str.maketrans({
+    '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#x27;',
+})
+
 
 def get_themes(title):
     """Get themes for a post title."""
-    lower = title.lower()
-    for key, themes in THEME_MAP.items():
-        if key in lower:
-            return themes
+    match = _THEME_KEY_RE.search(title.lower())
+    if match:
+        return THEME_MAP[match.group(0)]
     return []
 
 
 def update_post_html(post_path, year, themes):
     """Update a post HTML file: remove Source/Type, add theme tags."""
-    content = post_path.read_text(encoding='utf-8')
+    content = post_path.read_bytes().decode('utf-8')
     original = content
 
-    # Replace the metadata div: year + type + source → year + themes
-    meta_match = re.search(
-        r'(<div class="flex flex-wrap gap-3 text-sm text-gray-600 mb-4">)\s*(.*?)\s*(</div>)',
-        content, re.DOTALL
-    )
-    if meta_match:
-        theme_spans = [f'<span class="bg-gray-200 px-2 py-1 rounded">{year}</span>']
-        for theme in themes:
-            color = THEME_COLORS.get(theme, "bg-gray-100 text-gray-800")
-            theme_spans.append(f'<span class="{color} px-2 py-1 rounded">{theme}</span>')
-
-        new_meta = meta_match.group(1) + '\n        ' + '\n        '.join(theme_spans) + '\n      ' + meta_match.group(3)
-        content = content[:meta_match.start()] + new_meta + content[meta_match.end():]
-
-    # Also remove View Original TXT link, keep only PDF
-    content = re.sub(
-        r'\s*<a href="https://rickover-corpus\.s3\.us-east-1\.amazonaws\.com/[^"]+\.txt"[^>]*>View Original TXT</a>',
-        '', content
-    )
+    theme_spans = [f'<span class="bg-gray-200 px-2 py-1 rounded">{year}</span>'] + [
+        _POST_THEME_SPAN.get(theme) or f'<span class="bg-gray-100 text-gray-800 px-2 py-1 rounded">{theme}</span>'
+        for theme in themes
+    ]
+    meta_replaced = False
+
+    def replace(match):
+        nonlocal meta_replaced
+        # Remove View Original TXT link, keep only PDF
+        if match.group(1) is None:
+            return ''
+        # Replace the first metadata div: year + type + source → year + themes
+        if meta_replaced:
+            return match.group(0)
+        meta_replaced = True
+        return match.group(1) + '\n        ' + '\n        '.join(theme_spans) + '\n      ' + match.group(3)
+
+    content = _META_OR_TXT_LINK_RE.sub(replace, content)
 
     if content != original:
-        post_path.write_text(content, encoding='utf-8')
+        post_path.write_bytes(content.encode('utf-8'))
         return True
     return False
 
 
+@lru_cache(maxsize=None)
+def card_theme_spans(themes: tuple) -> str:
+    """Theme tag spans for a blog card; only a handful of theme combinations exist."""
+    return ''.join(
+        ' ' + (_CARD_THEME_SPAN.get(theme) or f'<span class="bg-gray-100 text-gray-800 px-2 py-0.5 rounded">{theme}</span>')
+        for theme in themes
+    )
+
+
 def regenerate_blog_html(data):
     """Regenerate blog.html with theme tags instead of type tags."""
     gemini_posts = [e for e in data if e.get("gemini") and e.get("blog_page")]
@@ -130,26 +177,21 @@ def regenerate_blog_html(data):
         blog_page = entry.get("blog_page", "")
         themes = entry.get("themes", [])
 
-        title_escaped = html_lib.escape(title, quote=True)
-        summary_escaped = html_lib.escape(summary, quote=True)
-        summary_preview = html_lib.escape(summary[:280], quote=True)
+        title_escaped = title.translate(_HTML_ESCAPE_TABLE)
+        summary_escaped = summary.translate(_HTML_ESCAPE_TABLE)
+        summary_preview = summary[:280].translate(_HTML_ESCAPE_TABLE)
         if len(summary) > 280:
             summary_preview += "..."
 
-        theme_spans = [f'<span class="bg-gray-200 px-2 py-0.5 rounded text-gray-700">{year}</span>']
-        for theme in themes:
-            color = THEME_COLORS.get(theme, "bg-gray-100 text-gray-800")
-            theme_spans.append(f'<span class="{color} px-2 py-0.5 rounded">{theme}</span>')
-
-        card = f'''      <a href="{blog_page}" class="block bg-white border border-gray-200 rounded-lg p-5 shadow-sm hover:shadow-md transition-shadow no-underline" data-title="{title_escaped}" data-summary="{summary_escaped}" data-year="{year}" data-themes="{','.join(themes)}">
-        <div class="flex items-start justify-between mb-2">
-          <h2 class="text-lg font-semibold text-gray-900" style="text-decoration:none">{title_escaped}</h2>
-        </div>
-        <div class="flex flex-wrap gap-2 mb-3 text-sm">
-          {' '.join(theme_spans)}
-        </div>
-        <p class="text-sm text-gray-600 leading-relaxed" style="text-decoration:none">{summary_preview}</p>
-      </a>'''
+        card = _CARD_TEMPLATE.format_map({
+            "blog_page": blog_page,
+            "title": title_escaped,
+            "summary": summary_escaped,
+            "year": year,
+            "themes_csv": ','.join(themes),
+            "theme_spans": card_theme_spans(tuple(themes)),
+            "preview": summary_preview,
+        })
         cards_html.append(card)
 
     blog_content = f'''<!DOCTYPE html>
@@ -267,8 +309,7 @@ def regenerate_blog_html(data):
 
 
 def main():
-    with open(MANIFEST, encoding='utf-8') as f:
-        data = json.load(f)
+    data = load_manifest(MANIFEST.read_bytes())
 
     updated_posts = 0
     for entry in data:
@@ -293,8 +334,7 @@ def main():
                     print(f"  Updated: {post_path.name} → {', '.join(themes)}")
 
     # Save manifest
-    with open(MANIFEST, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    MANIFEST.write_bytes(dump_manifest(data))
 
     # Regenerate blog.html
     blog_html = regenerate_blog_html(data)
@@ -6,13 +6,24 @@ Clean up generated blog post HTML files:
 - Remove OCR noise/artifacts
 - Fix excessive <br> tags and redundant newlines
 - Fix ALL CAPS titles in <h1> and <title> tags
+
+Files whose size and mtime, or failing that content hash, match
+.cleanup_cache.json from the previous run are skipped, unless this script has
+changed since; delete that file to force a full re-clean.
 """
 
 import re
 import html
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from pathlib import Path
+from typing import Optional
+
+from file_cache import file_signature, load_cache, read_unless_cached, rules_version, save_cache
 
 POSTS_DIR = Path(__file__).resolve().parent.parent / "posts"
+CACHE_PATH = POSTS_DIR.parent / ".cleanup_cache.json"
+RULES_VERSION = rules_version(__file__)
 
 # Words/acronyms that should stay uppercase
 KEEP_UPPER = {
@@ -27,20 +38,119 @@ KEEP_UPPER = {
     "AM", "PM", "AD", "BC", "OPEC",
 }
 
+# KEEP_UPPER with periods removed, for matching against a word's letters
+_KEEP_UPPER_NORM = frozenset(a.replace(".", "").upper() for a in KEEP_UPPER)
+
 # Common title words that should stay lowercase (in title case)
 TITLE_LOWER = {"a", "an", "the", "and", "but", "or", "for", "nor", "on",
                "at", "to", "from", "by", "in", "of", "with", "as", "is"}
 
-
+# Common OCR artifacts (matched against the stripped paragraph text)
+NOISE_PATTERNS = [
+    r'^[;:.,\-=\+\*\|]+$',           # Just punctuation
+    r'^[oeao0O\s\-=]+$',              # Common OCR garbage
+    r'^\d{1,3}$',                      # Page numbers
+    r'^[\s]*$',                         # Whitespace only
+    r'^[a-z\d\s\-=\+\.\,]{2,8}$',    # Short garbled text (like "oo 85 oy", "a = oe")
+    # Timestamps from web page saves (e.g. "6/12/2025, 10:48 PM" or "1 of 12 6/12/2025, 10:49 PM")
+    r'^\d{1,2}/\d{1,2}/\d{4},?\s*\d{1,2}:\d{2}\s*(AM|PM)?$',
+    r'^\d{1,2}\s+of\s+\d{1,3}\s+\d{1,2}/\d{1,2}/\d{4}',
+    # Reader mode artifacts
+    r'^R\|.*Q[\-\+].*',
+    # Garbled caps runs (corrupted OCR, 4+ consecutive all-caps words of 5+ chars)
+    r'^[A-Z\s,.\-;:©®@>\d\(\)]+$',
+    # Website headers
+    r'^Growing Leaders for the Public Service$',
+    # Social media / Substack artifacts
+    r'^@\s*\d+\s*O\s*\d+.*Share',
+    r'^\.\s*\d\)\s*ae\s+ise\s+gettyimages',
+    r'^G\d+\s+claude\s+berube',
+]
+
+# OCR artifacts whose pattern scans the whole line, keyed by a literal that
+# any match must contain so the regex only runs when it can possibly match
+NOISE_SCAN_PATTERNS = [
+    # Browser UI / reader mode artifacts
+    ('Reader', r'.*Open\s*in\s*Reader.*'),
+    ('Auto highlighting', r'.*Auto highlighting.*'),
+    # URL-only lines (repeated page headers from web saves)
+    ('http', r'^.*https?://\S+\.(htm|html|org|com|gov|pdf)\s*$'),
+    ('http', r'^.*https?:/[A-Za-z]\S+\.(htm|html|org|com|gov)\S*\s*$'),
+    # Website names
+    ('aders.org', r'^.*[Ll][ée]aders\.org.*$'),
+]
+
+# Boilerplate disclaimers/copyright/headers (searched in lowercased text)
+BOILERPLATE_PATTERNS = [
+    r'this speech reflects the views',
+    r'does not\s+.*necessarily reflect the views',
+    r'copyright\s+\d{4}',
+    r'copyricht\s+\d{4}',  # OCR misspelling
+    r'no permission needed for newspaper',
+    r'above copyright notice',
+    r'if most of speech reprinted',
+    r'department of the navy',
+    r'department of energy',
+    r'for official use only',
+    r'not for publication',
+    r'embargoed.*until',
+    r'advance\s+text',
+    r'delivery\s*copy',
+    r'check\s+against\s+delivery',
+    r'as\s+prepared\s+for\s+delivery',
+]
+
+# Compiled once at import; these run per word/paragraph across every post
+_NOISE_RE = re.compile('|'.join(f'(?:{p})' for p in NOISE_PATTERNS))
+_NOISE_SCAN_RES = tuple((needle, re.compile(p)) for needle, p in NOISE_SCAN_PATTERNS)
+_BOILERPLATE_RES = tuple(re.compile(p) for p in BOILERPLATE_PATTERNS)
+_ENTITY_STRIP_RE = re.compile(r'&[a-z]+;')
+_NONALPHA_RE = re.compile(r'[^A-Za-z]')
+_HEADER_URL_RE = re.compile(r'https?://?[A-Za-z]?\S+\.(htm|html|org|com|gov)')
+_URL_RE = re.compile(r'https?://\S+')
+_TAG_RE = re.compile(r'<[^>]+>')
+_LEAD_PAGENUM_RE = re.compile(r'^\d{1,3}\s*<br>\s*')
+_OCR_BR_PAGENUM_RE = re.compile(r'<br>\s*\d{1,3}\s*<br>')
+# <br> runs in one pass: a paragraph holding only <br>s (keeps the whitespace
+# before them), a trailing run, a leading run, then 3+ in a row
+_BR_RUN_RE = re.compile(
+    r'(<p>\s*)(?:<br>\s*)+</p>'
+    r'|(?:<br>\s*)+(</p>)'
+    r'|(<p>)\s*(?:<br>\s*)+'
+    r'|(?:<br>\s*){3,}'
+)
+_PARA_RE = re.compile(r'<p>(.*?)</p>', re.DOTALL)
+_TITLE_RE = re.compile(r'<title>(.*?) — The Rickover Corpus</title>')
+_H1_RE = re.compile(r'<h1 class="text-3xl font-bold tracking-tight mb-3">(.*?)</h1>')
+
+# The OCR div has no nested divs, so it runs from the opening tag to the next
+# </div>; str.find locates it without a DOTALL regex scan of the whole file
+_OCR_DIV_OPEN = '<div class="ocr-text text-gray-800">'
+_DIV_CLOSE = '</div>'
+
+# Trailing characters ignored when checking whether a word ends a sentence
+_TRAIL_PUNCT = ',"\''
+
+# Re-escapes &, <, > and " in one pass over the paragraph
+_HTML_ESCAPE_TABLE = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;'})
+
+
+# The text predicates and case converters below are pure functions of their
+# input, and running headers/banners repeat within and across posts
+@lru_cache(maxsize=8192)
 def is_all_caps(text: str) -> bool:
     """Check if text is predominantly ALL CAPS."""
-    letters = [c for c in text if c.isalpha()]
+    # No uppercase letters at all; islower() answers that without building a string
+    if text.islower():
+        return False
+    letters = ''.join(filter(str.isalpha, text))
     if len(letters) < 4:
         return False
-    upper_count = sum(1 for c in letters if c.isupper())
+    upper_count = sum(map(str.isupper, letters))
     return upper_count / len(letters) > 0.7
 
 
+@lru_cache(maxsize=8192)
 def sentence_case(text: str) -> str:
     """Convert ALL CAPS text to sentence case, preserving known acronyms."""
     if not is_all_caps(text):
@@ -52,26 +162,22 @@ def sentence_case(text: str) -> str:
 
     for i, word in enumerate(words):
         # Strip HTML entities and punctuation for checking
-        clean = re.sub(r'&[a-z]+;', '', word)
-        clean_alpha = re.sub(r'[^A-Za-z]', '', clean)
+        clean = _ENTITY_STRIP_RE.sub('', word)
+        clean_alpha = _NONALPHA_RE.sub('', clean)
 
         # Check if this word (or its base) should stay uppercase
         word_upper = clean_alpha.upper()
-        keep = False
-        for acronym in KEEP_UPPER:
-            if word_upper == acronym.replace(".", "").upper():
-                keep = True
-                break
+        keep = word_upper in _KEEP_UPPER_NORM
 
         # Check for words with periods that are acronyms (H.G., U.S., etc.)
-        if re.match(r'^[A-Z]\.[A-Z]\.?', word):
+        if is_dot_acronym(word):
             keep = True
 
         if keep:
             result.append(word)
             # Only treat as sentence end if the period is truly sentence-ending
-            stripped = word.rstrip(',').rstrip('"').rstrip("'")
-            if stripped.endswith(('.', '?', '!')) and not re.match(r'^[A-Z]\.[A-Z]', stripped):
+            stripped = word.rstrip(_TRAIL_PUNCT)
+            if stripped.endswith(('.', '?', '!')) and not is_dot_acronym(stripped):
                 after_period = True
             else:
                 after_period = False
@@ -88,21 +194,30 @@ def sentence_case(text: str) -> str:
         result.append(lower_word)
 
         # Check if this word ends a sentence (period, question mark, exclamation, colon)
-        stripped = word.rstrip(',').rstrip('"').rstrip("'")
-        if stripped.endswith(('.', '?', '!')) and not re.match(r'^[A-Z]\.[A-Z]', stripped):
+        stripped = word.rstrip(_TRAIL_PUNCT)
+        if stripped.endswith(('.', '?', '!')) and not is_dot_acronym(stripped):
             after_period = True
 
     return ' '.join(result)
 
 
+def is_dot_acronym(word: str) -> bool:
+    """Check if a word starts like a dotted acronym (H.G., U.S., ...)."""
+    return len(word) >= 3 and word[1] == '.' and 'A' <= word[0] <= 'Z' and 'A' <= word[2] <= 'Z'
+
+
 def capitalize_first(word: str) -> str:
     """Capitalize the first alphabetic character in a word."""
+    # Common case: the word starts with a letter
+    if word[:1].isalpha():
+        return word[0].upper() + word[1:]
     for i, c in enumerate(word):
         if c.isalpha():
             return word[:i] + c.upper() + word[i+1:]
     return word
 
 
+@lru_cache(maxsize=8192)
 def title_case_smart(text: str) -> str:
     """Convert ALL CAPS title to smart title case."""
     if not is_all_caps(text):
@@ -112,17 +227,13 @@ def title_case_smart(text: str) -> str:
     result = []
 
     for i, word in enumerate(words):
-        clean_alpha = re.sub(r'[^A-Za-z]', '', word)
+        clean_alpha = _NONALPHA_RE.sub('', word)
         word_upper = clean_alpha.upper()
 
         # Keep known acronyms
-        keep = False
-        for acronym in KEEP_UPPER:
-            if word_upper == acronym.replace(".", "").upper():
-                keep = True
-                break
+        keep = word_upper in _KEEP_UPPER_NORM
 
-        if re.match(r'^[A-Z]\.[A-Z]\.?', word):
+        if is_dot_acronym(word):
             keep = True
 
         if keep:
@@ -135,20 +246,20 @@ def title_case_smart(text: str) -> str:
     return ' '.join(result)
 
 
+@lru_cache(maxsize=8192)
 def is_page_number(text: str) -> bool:
     """Check if a paragraph is just a page number or OCR noise."""
     stripped = text.strip()
-    # Pure page numbers
-    if re.match(r'^\d{1,3}$', stripped):
+    # Pure page numbers (isdecimal matches exactly what \d does)
+    if len(stripped) <= 3 and stripped.isdecimal():
         return True
     # OCR noise: very short, mostly non-alpha
     if len(stripped) <= 4:
-        alpha = sum(1 for c in stripped if c.isalpha())
-        if alpha <= 1:
-            return True
+        return sum(map(str.isalpha, stripped)) <= 1
     return False
 
 
+@lru_cache(maxsize=8192)
 def is_ocr_noise(text: str) -> bool:
     """Check if text is OCR noise/artifacts."""
     stripped = text.strip()
@@ -156,45 +267,22 @@ def is_ocr_noise(text: str) -> bool:
     if len(stripped) <= 3 and not stripped.isalpha():
         return True
     # Common OCR artifacts
-    noise_patterns = [
-        r'^[;:.,\-=\+\*\|]+$',           # Just punctuation
-        r'^[oeao0O\s\-=]+$',              # Common OCR garbage
-        r'^\d{1,3}$',                      # Page numbers
-        r'^[\s]*$',                         # Whitespace only
-        r'^[a-z\d\s\-=\+\.\,]{2,8}$',    # Short garbled text (like "oo 85 oy", "a = oe")
-        # Timestamps from web page saves (e.g. "6/12/2025, 10:48 PM" or "1 of 12 6/12/2025, 10:49 PM")
-        r'^\d{1,2}/\d{1,2}/\d{4},?\s*\d{1,2}:\d{2}\s*(AM|PM)?$',
-        r'^\d{1,2}\s+of\s+\d{1,3}\s+\d{1,2}/\d{1,2}/\d{4}',
-        # Browser UI / reader mode artifacts
-        r'.*Open\s*in\s*Reader.*',
-        r'.*Auto highlighting.*',
-        r'^R\|.*Q[\-\+].*',
-        # URL-only lines (repeated page headers from web saves)
-        r'^.*https?://\S+\.(htm|html|org|com|gov|pdf)\s*$',
-        r'^.*https?:/[A-Za-z]\S+\.(htm|html|org|com|gov)\S*\s*$',
-        # Garbled caps runs (corrupted OCR, 4+ consecutive all-caps words of 5+ chars)
-        r'^[A-Z\s,.\-;:©®@>\d\(\)]+$',
-        # Website names/headers
-        r'^.*[Ll][ée]aders\.org.*$',
-        r'^Growing Leaders for the Public Service$',
-        # Social media / Substack artifacts
-        r'^@\s*\d+\s*O\s*\d+.*Share',
-        r'^\.\s*\d\)\s*ae\s+ise\s+gettyimages',
-        r'^G\d+\s+claude\s+berube',
-    ]
-    for pattern in noise_patterns:
-        if re.match(pattern, stripped):
+    if _NOISE_RE.match(stripped):
+        return True
+    for needle, pattern in _NOISE_SCAN_RES:
+        if needle in stripped and pattern.match(stripped):
             return True
     return False
 
 
+@lru_cache(maxsize=8192)
 def is_repeated_header(text: str) -> bool:
     """Check if paragraph is a repeated page header from web-saved PDFs."""
     stripped = text.strip()
     # Lines that are title + URL (repeated on each page of web-saved PDFs)
-    if re.search(r'https?://?[A-Za-z]?\S+\.(htm|html|org|com|gov)', stripped):
+    if _HEADER_URL_RE.search(stripped):
         # If the line is mostly a URL or title+URL, it's a header
-        url_match = re.search(r'https?://\S+', stripped)
+        url_match = _URL_RE.search(stripped)
         if url_match:
             non_url = stripped[:url_match.start()].strip() + stripped[url_match.end():].strip()
             # If what's left is short (just a title), it's a repeated header
@@ -203,40 +291,24 @@ def is_repeated_header(text: str) -> bool:
     return False
 
 
+@lru_cache(maxsize=8192)
 def is_boilerplate(text: str) -> bool:
     """Check if text is a boilerplate disclaimer/copyright/header from speech PDFs."""
     lower = text.lower().strip()
-    patterns = [
-        r'this speech reflects the views',
-        r'does not\s+.*necessarily reflect the views',
-        r'copyright\s+\d{4}',
-        r'copyricht\s+\d{4}',  # OCR misspelling
-        r'no permission needed for newspaper',
-        r'above copyright notice',
-        r'if most of speech reprinted',
-        r'department of the navy',
-        r'department of energy',
-        r'for official use only',
-        r'not for publication',
-        r'embargoed.*until',
-        r'advance\s+text',
-        r'delivery\s*copy',
-        r'check\s+against\s+delivery',
-        r'as\s+prepared\s+for\s+delivery',
-    ]
-    for pattern in patterns:
-        if re.search(pattern, lower):
+    for pattern in _BOILERPLATE_RES:
+        if pattern.search(lower):
             return True
     return False
 
 
+@lru_cache(maxsize=8192)
 def has_garbled_caps(text: str) -> bool:
     """Check if text contains garbled ALL CAPS runs (corrupted OCR from web saves)."""
     # Look for runs of 4+ consecutive ALL-CAPS words of 4+ chars each
     words = text.split()
     caps_run = 0
     for w in words:
-        clean = re.sub(r'[^A-Za-z]', '', w)
+        clean = _NONALPHA_RE.sub('', w)
         if len(clean) >= 4 and clean.isupper():
             caps_run += 1
             if caps_run >= 4:
@@ -248,80 +320,82 @@ def has_garbled_caps(text: str) -> bool:
 
 def clean_br_tags(html_text: str) -> str:
     """Clean up excessive <br> tags."""
-    # Remove <br> at end of paragraphs (before </p>)
-    html_text = re.sub(r'(<br>\s*)+</p>', '</p>', html_text)
-    # Remove <br> at start of paragraphs (after <p>)
-    html_text = re.sub(r'<p>\s*(<br>\s*)+', '<p>', html_text)
-    # Collapse multiple <br> into one
-    html_text = re.sub(r'(<br>\s*){3,}', '<br><br>', html_text)
-    return html_text
+    return _BR_RUN_RE.sub(_replace_br_run, html_text)
 
 
-def clean_ocr_div(ocr_html: str) -> str:
-    """Clean up the OCR text content within the div."""
-    # Extract paragraphs
-    paragraphs = re.findall(r'<p>(.*?)</p>', ocr_html, re.DOTALL)
+def _replace_br_run(match: re.Match) -> str:
+    """Drop <br>s at the start or end of a paragraph; collapse longer runs to two."""
+    if match.group(1) is not None:
+        return match.group(1) + '</p>'
+    return match.group(2) or match.group(3) or '<br><br>'
 
-    cleaned = []
-    for p in paragraphs:
-        # Decode HTML entities for processing, then re-encode
-        text = p.strip()
 
-        if not text:
-            continue
+def clean_paragraph(text: str) -> str:
+    """Clean the inner HTML of one OCR paragraph; returns '' if it should be dropped."""
+    # Decode HTML entities for processing, then re-encode
+    text = text.strip()
 
-        # Get plain text version for checks
-        plain = re.sub(r'<[^>]+>', ' ', text)
-        plain = html.unescape(plain).strip()
+    if not text:
+        return ''
 
-        # Skip page numbers and OCR noise
-        if is_page_number(plain) or is_ocr_noise(plain):
-            continue
+    # Get plain text version for checks
+    plain = _TAG_RE.sub(' ', text)
+    plain = html.unescape(plain).strip()
 
-        # Skip repeated web-page headers (title + URL combos)
-        if is_repeated_header(plain):
-            continue
+    # Skip page numbers and OCR noise
+    if is_page_number(plain) or is_ocr_noise(plain):
+        return ''
 
-        # Skip boilerplate disclaimers and copyright notices
-        if is_boilerplate(plain):
-            continue
+    # Skip repeated web-page headers (title + URL combos)
+    if is_repeated_header(plain):
+        return ''
+
+    # Skip boilerplate disclaimers and copyright notices
+    if is_boilerplate(plain):
+        return ''
 
-        # Skip paragraphs that are entirely garbled caps (corrupted OCR)
-        if has_garbled_caps(plain) and len(plain) < 200:
-            # Only skip if the paragraph is short-ish (long ones might have real content mixed in)
-            alpha_chars = [c for c in plain if c.isalpha()]
-            if alpha_chars:
-                upper_ratio = sum(1 for c in alpha_chars if c.isupper()) / len(alpha_chars)
-                if upper_ratio > 0.8:
-                    continue
-
-        # Strip leading page numbers embedded in paragraphs (e.g. "4\nOur people...")
-        text = re.sub(r'^\d{1,3}\s*<br>\s*', '', text)
-        text = re.sub(r'<br>\s*\d{1,3}\s*<br>', '<br>', text)
-
-        # Convert ALL CAPS to sentence case
-        # Join <br> text into single string so sentence boundaries work across lines
-        merged = text.replace('<br>', ' ')
-        unescaped = html.unescape(merged)
-        converted = sentence_case(unescaped)
-        # Re-escape special chars
-        converted = converted.replace('&', '&amp;')
-        converted = converted.replace('<', '&lt;')
-        converted = converted.replace('>', '&gt;')
-        converted = converted.replace('"', '&quot;')
-        text = converted
-        cleaned.append('<p>' + text + '</p>')
-
-    return '\n'.join(cleaned)
-
-
-def clean_post_file(filepath: Path) -> bool:
-    """Clean up a single post HTML file. Returns True if changes were made."""
-    content = filepath.read_text(encoding='utf-8')
+    # Skip paragraphs that are entirely garbled caps (corrupted OCR)
+    if has_garbled_caps(plain) and len(plain) < 200:
+        # Only skip if the paragraph is short-ish (long ones might have real content mixed in)
+        alpha_chars = ''.join(filter(str.isalpha, plain))
+        if alpha_chars:
+            upper_ratio = sum(map(str.isupper, alpha_chars)) / len(alpha_chars)
+            if upper_ratio > 0.8:
+                return ''
+
+    # Strip leading page numbers embedded in paragraphs (e.g. "4\nOur people...")
+    text = _LEAD_PAGENUM_RE.sub('', text)
+    text = _OCR_BR_PAGENUM_RE.sub('<br>', text)
+
+    # Convert ALL CAPS to sentence case
+    # Join <br> text into single string so sentence boundaries work across lines
+    merged = text.replace('<br>', ' ')
+    unescaped = html.unescape(merged)
+    converted = sentence_case(unescaped)
+    # Re-escape special chars
+    return '<p>' + converted.translate(_HTML_ESCAPE_TABLE) + '</p>'
+
+
+def clean_ocr_div(ocr_html: str) -> str:
+    """Clean up the OCR text content within the div."""
+    return '\n'.join(filter(None, map(clean_paragraph, _PARA_RE.findall(ocr_html))))
+
+
+def clean_post_file(filepath: Path, cached: Optional[list] = None) -> tuple[str, bool, list]:
+    """Clean up a single post HTML file.
+
+    Returns (file name, whether changes were made, file_signature of the cleaned file).
+    A file matching its cached signature was already cleaned and is skipped.
+    """
+    raw, signature = read_unless_cached(filepath, cached, RULES_VERSION)
+    if raw is None:
+        return filepath.name, False, signature
+
+    content = raw.decode('utf-8')
     original = content
 
     # Fix ALL CAPS in <title> tag
-    title_match = re.search(r'<title>(.*?) — The Rickover Corpus</title>', content)
+    title_match = _TITLE_RE.search(content)
     if title_match:
         old_title = title_match.group(1)
         new_title = title_case_smart(html.unescape(old_title))
@@ -333,7 +407,7 @@ def clean_post_file(filepath: Path) -> bool:
             )
 
     # Fix ALL CAPS in <h1> tag
-    h1_match = re.search(r'<h1 class="text-3xl font-bold tracking-tight mb-3">(.*?)</h1>', content)
+    h1_match = _H1_RE.search(content)
     if h1_match:
         old_h1 = h1_match.group(1)
         new_h1 = title_case_smart(html.unescape(old_h1))
@@ -345,37 +419,47 @@ def clean_post_file(filepath: Path) -> bool:
             )
 
     # Clean OCR text div
-    ocr_match = re.search(
-        r'(<div class="ocr-text text-gray-800">\s*)(.*?)(</div>)',
-        content, re.DOTALL
-    )
-    if ocr_match:
-        prefix = ocr_match.group(1)
-        ocr_content = ocr_match.group(2).strip()
-        suffix = ocr_match.group(3)
+    ocr_start = content.find(_OCR_DIV_OPEN)
+    body_start = ocr_start + len(_OCR_DIV_OPEN)
+    ocr_end = content.find(_DIV_CLOSE, body_start) if ocr_start != -1 else -1
+    if ocr_end != -1:
+        ocr_content = content[body_start:ocr_end].strip()
+        ocr_end += len(_DIV_CLOSE)
 
         # Only clean if it has actual OCR content (not placeholder)
         if '<p>' in ocr_content and 'Full OCR text will be available' not in ocr_content:
             cleaned_ocr = clean_ocr_div(ocr_content)
             cleaned_ocr = clean_br_tags(cleaned_ocr)
-            content = content[:ocr_match.start()] + prefix + '\n        ' + cleaned_ocr + '\n      ' + suffix + content[ocr_match.end():]
+            new_section = _OCR_DIV_OPEN + '\n        ' + cleaned_ocr + '\n      ' + _DIV_CLOSE
+            if new_section != content[ocr_start:ocr_end]:
+                content = content[:ocr_start] + new_section + content[ocr_end:]
 
     if content != original:
-        filepath.write_text(content, encoding='utf-8')
-        return True
-    return False
+        raw = content.encode('utf-8')
+        filepath.write_bytes(raw)
+        return filepath.name, True, file_signature(filepath, raw, RULES_VERSION)
+    return filepath.name, False, signature
 
 
 def main():
     posts = sorted(POSTS_DIR.glob("*.html"))
     print(f"Found {len(posts)} post files")
 
+    cache = load_cache(CACHE_PATH)
+    cached = [cache.get(post.name) for post in posts]
+
+    # Each file is cleaned independently, so fan out across cores
+    with ProcessPoolExecutor() as executor:
+        results = list(executor.map(clean_post_file, posts, cached, chunksize=8))
+
+    save_cache(CACHE_PATH, {name: signature for name, _, signature in results})
+
     changed = 0
-    for i, post in enumerate(posts, 1):
-        if clean_post_file(post):
+    for i, (name, was_changed, _) in enumerate(results, 1):
+        if was_changed:
             changed += 1
             if changed <= 10 or changed % 20 == 0:
-                print(f"  [{i}/{len(posts)}] Cleaned: {post.name}")
+                print(f"  [{i}/{len(posts)}] Cleaned: {name}")
 
     print(f"\nDone: {changed}/{len(posts)} files cleaned")
 
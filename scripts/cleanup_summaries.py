@@ -4,57 +4,108 @@ Clean markdown decorators from Summary fields in manifest.json
 and in the corresponding post HTML files.
 
 Removes: *italics*, **bold**, `code`, ## headings
+
+Post files whose size and mtime, or failing that content hash, match
+.cleanup_summaries_cache.json from the previous run are skipped, unless this
+script has changed since; delete that file to force a full re-clean.
 """
 
-import json
 import re
 import html as html_lib
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import Optional
+
+from file_cache import file_signature, load_cache, read_unless_cached, rules_version, save_cache
+from manifest_io import dump_manifest, load_manifest
 
 ROOT = Path(__file__).resolve().parent.parent
 MANIFEST = ROOT / "manifest.json"
 POSTS_DIR = ROOT / "posts"
+CACHE_PATH = ROOT / ".cleanup_summaries_cache.json"
+RULES_VERSION = rules_version(__file__)
+
+
+# Markdown patterns, compiled once
+_BOLD_STAR_RE = re.compile(r'\*\*(.+?)\*\*')
+_BOLD_UNDERSCORE_RE = re.compile(r'__(.+?)__')
+# Italic: *text* or _text_ (but not inside words like don't)
+_ITALIC_STAR_RE = re.compile(r'(?<!\w)\*(.+?)\*(?!\w)')
+_ITALIC_UNDERSCORE_RE = re.compile(r'(?<!\w)_(.+?)_(?!\w)')
+_CODE_RE = re.compile(r'`(.+?)`')
+_HEADING_RE = re.compile(r'^#{1,6}\s+', re.MULTILINE)
+_STRIKE_RE = re.compile(r'~~(.+?)~~')
+_UNCLOSED_LEAD_RE = re.compile(r'\*{1,2}(?=\w)')
+_UNCLOSED_TRAIL_RE = re.compile(r'(?<=\w)\*{1,2}')
+
+# Every pattern above needs one of these characters, so text without any is
+# returned as-is
+_MARKDOWN_CHARS = '*_`~#'
+
+# Post HTML locations holding a summary (content is group 2)
+_META_DESC_RE = re.compile(r'(<meta\s+name="description"\s+content=")(.*?)(")', re.DOTALL)
+_SUMMARY_P_RE = re.compile(
+    r'(<h2 class="text-lg font-semibold mb-2">Summary</h2>\s*<p class="text-gray-700 leading-relaxed">)(.*?)(</p>)',
+    re.DOTALL
+)
+
+
+def has_markdown(text: str) -> bool:
+    """Check if text contains any character a markdown pattern could match."""
+    return any(c in text for c in _MARKDOWN_CHARS)
 
 
 def strip_markdown(text: str) -> str:
     """Remove markdown formatting from text, keeping the inner content."""
+    if not has_markdown(text):
+        return text
     # Bold: **text** or __text__
-    text = re.sub(r'\*\*(.+?)\*\*', r'\1', text)
-    text = re.sub(r'__(.+?)__', r'\1', text)
-    # Italic: *text* or _text_ (but not inside words like don't)
-    text = re.sub(r'(?<!\w)\*(.+?)\*(?!\w)', r'\1', text)
-    text = re.sub(r'(?<!\w)_(.+?)_(?!\w)', r'\1', text)
+    text = _BOLD_STAR_RE.sub(r'\1', text)
+    text = _BOLD_UNDERSCORE_RE.sub(r'\1', text)
+    # Italic: *text* or _text_
+    text = _ITALIC_STAR_RE.sub(r'\1', text)
+    text = _ITALIC_UNDERSCORE_RE.sub(r'\1', text)
     # Inline code: `text`
-    text = re.sub(r'`(.+?)`', r'\1', text)
+    text = _CODE_RE.sub(r'\1', text)
     # Headings: ## text -> text
-    text = re.sub(r'^#{1,6}\s+', '', text, flags=re.MULTILINE)
+    text = _HEADING_RE.sub('', text)
     # Strikethrough: ~~text~~
-    text = re.sub(r'~~(.+?)~~', r'\1', text)
+    text = _STRIKE_RE.sub(r'\1', text)
     return text
 
 
 def strip_markdown_html_escaped(text: str) -> str:
     """Strip markdown from HTML-escaped text (where * is literal, not &ast;)."""
+    if not has_markdown(text):
+        return text
     # In HTML attributes/content, markdown chars are usually literal
-    text = re.sub(r'\*\*(.+?)\*\*', r'\1', text)
-    text = re.sub(r'__(.+?)__', r'\1', text)
-    text = re.sub(r'(?<!\w)\*(.+?)\*(?!\w)', r'\1', text)
-    text = re.sub(r'(?<!\w)_(.+?)_(?!\w)', r'\1', text)
-    text = re.sub(r'`(.+?)`', r'\1', text)
-    text = re.sub(r'~~(.+?)~~', r'\1', text)
+    text = _BOLD_STAR_RE.sub(r'\1', text)
+    text = _BOLD_UNDERSCORE_RE.sub(r'\1', text)
+    text = _ITALIC_STAR_RE.sub(r'\1', text)
+    text = _ITALIC_UNDERSCORE_RE.sub(r'\1', text)
+    text = _CODE_RE.sub(r'\1', text)
+    text = _STRIKE_RE.sub(r'\1', text)
     # Remove leftover unclosed markdown markers (from truncated text)
-    text = re.sub(r'\*{1,2}(?=\w)', '', text)
-    text = re.sub(r'(?<=\w)\*{1,2}', '', text)
+    text = _UNCLOSED_LEAD_RE.sub('', text)
+    text = _UNCLOSED_TRAIL_RE.sub('', text)
     return text
 
 
-def clean_post_file(post_path: Path) -> bool:
-    """Clean markdown from summary section and meta description in a post HTML file."""
-    content = post_path.read_text(encoding='utf-8')
+def clean_post_file(post_path: Path, cached: Optional[list] = None) -> tuple[str, bool, list]:
+    """Clean markdown from summary section and meta description in a post HTML file.
+
+    Returns (file name, whether changes were made, file_signature of the cleaned file).
+    A file matching its cached signature was already cleaned and is skipped.
+    """
+    raw, signature = read_unless_cached(post_path, cached, RULES_VERSION)
+    if raw is None:
+        return post_path.name, False, signature
+
+    content = raw.decode('utf-8')
     original = content
 
     # Clean meta description
-    meta_match = re.search(r'(<meta\s+name="description"\s+content=")(.*?)(")', content, re.DOTALL)
+    meta_match = _META_DESC_RE.search(content)
     if meta_match:
         old_desc = meta_match.group(2)
         new_desc = strip_markdown_html_escaped(old_desc)
@@ -62,10 +113,7 @@ def clean_post_file(post_path: Path) -> bool:
             content = content[:meta_match.start(2)] + new_desc + content[meta_match.end(2):]
 
     # Clean summary <p> tag
-    summary_match = re.search(
-        r'(<h2 class="text-lg font-semibold mb-2">Summary</h2>\s*<p class="text-gray-700 leading-relaxed">)(.*?)(</p>)',
-        content, re.DOTALL
-    )
+    summary_match = _SUMMARY_P_RE.search(content)
     if summary_match:
         old_summary = summary_match.group(2)
         new_summary = strip_markdown_html_escaped(old_summary)
@@ -73,14 +121,14 @@ def clean_post_file(post_path: Path) -> bool:
             content = content[:summary_match.start(2)] + new_summary + content[summary_match.end(2):]
 
     if content != original:
-        post_path.write_text(content, encoding='utf-8')
-        return True
-    return False
+        raw = content.encode('utf-8')
+        post_path.write_bytes(raw)
+        return post_path.name, True, file_signature(post_path, raw, RULES_VERSION)
+    return post_path.name, False, signature
 
 
 def main():
-    with open(MANIFEST, encoding='utf-8') as f:
-        data = json.load(f)
+    data = load_manifest(MANIFEST.read_bytes())
 
     changed_manifest = 0
     changed_posts = 0
@@ -101,15 +149,23 @@ def main():
 
     # Write updated manifest
     if changed_manifest > 0:
-        with open(MANIFEST, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        MANIFEST.write_bytes(dump_manifest(data))
 
     # Clean all post HTML files (meta descriptions + summary sections)
     posts = sorted(POSTS_DIR.glob("*.html"))
-    for post in posts:
-        if clean_post_file(post):
+    cache = load_cache(CACHE_PATH)
+    cached = [cache.get(post.name) for post in posts]
+
+    # Each file is cleaned independently, so fan out across cores
+    with ProcessPoolExecutor() as executor:
+        results = list(executor.map(clean_post_file, posts, cached, chunksize=8))
+
+    save_cache(CACHE_PATH, {name: signature for name, _, signature in results})
+
+    for name, was_changed, _ in results:
+        if was_changed:
             changed_posts += 1
-            print(f"  Updated: {post.name}")
+            print(f"  Updated: {name}")
 
     print(f"\nDone: {changed_manifest} summaries cleaned in manifest.json")
     print(f"      {changed_posts} post HTML files updated")
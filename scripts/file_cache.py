@@ -0,0 +1,49 @@
+"""Per-file cache of the post cleanup scripts, so unchanged posts are skipped.
+
+Each file's entry is [mtime_ns, size, SHA-1 of its bytes, rules version]. The
+rules version is a digest of the cleaning script's source, so editing its
+rules re-cleans every file.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Optional
+
+
+def rules_version(script_path: str) -> str:
+    """SHA-1 of a cleaning script's source."""
+    return hashlib.sha1(Path(script_path).read_bytes()).hexdigest()
+
+
+def file_signature(path: Path, raw: bytes, version: str) -> list:
+    """Cache entry for a file holding raw, cleaned by rules version."""
+    stat = path.stat()
+    return [stat.st_mtime_ns, stat.st_size, hashlib.sha1(raw).hexdigest(), version]
+
+
+def read_unless_cached(path: Path, cached: Optional[list], version: str) -> tuple[Optional[bytes], list]:
+    """Read a file unless its cache entry shows it was already cleaned.
+
+    Returns (file bytes, or None to skip the file; its current cache entry).
+    A stat() match skips the read entirely, a hash match skips the cleaning.
+    """
+    if cached and cached[3:] == [version]:
+        stat = path.stat()
+        if [stat.st_mtime_ns, stat.st_size] == cached[:2]:
+            return None, cached
+
+    raw = path.read_bytes()
+    signature = file_signature(path, raw, version)
+    if cached and cached[2:] == signature[2:]:
+        return None, signature
+    return raw, signature
+
+
+def load_cache(cache_path: Path) -> dict:
+    """File name -> cache entry from the previous run, or {} if there is none."""
+    return json.loads(cache_path.read_bytes()) if cache_path.exists() else {}
+
+
+def save_cache(cache_path: Path, signatures: dict):
+    cache_path.write_bytes(json.dumps(signatures, indent=2).encode('utf-8'))
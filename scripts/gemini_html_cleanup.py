@@ -6,9 +6,9 @@ unnecessary text while preserving the actual document content.
 """
 
 import os
-import re
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -20,6 +20,11 @@ from google import genai
 ROOT = Path(__file__).resolve().parent.parent
 POSTS_DIR = ROOT / "posts"
 
+# Concurrent Gemini requests
+MAX_WORKERS = 5
+
+OCR_DIV_OPEN = '<div class="ocr-text text-gray-800">'
+
 CLEANUP_PROMPT = """You are cleaning up the HTML text of a historical speech, memo, or testimony by Admiral Hyman G. Rickover.
 
 The text below is already extracted and wrapped in <p> tags. Your job is to clean it up:
@@ -51,32 +56,37 @@ def get_gemini_posts():
     return [entry for entry in data if entry.get("gemini")]
 
 
-def extract_ocr_html(post_path: Path) -> str:
-    """Extract the OCR text div content from a post HTML file."""
-    content = post_path.read_text(encoding='utf-8')
-    match = re.search(
-        r'<div class="ocr-text text-gray-800">\s*(.*?)\s*</div>',
-        content, re.DOTALL
-    )
-    if match:
-        return match.group(1).strip()
-    return ""
+def find_ocr_div(content: str) -> tuple[int, int]:
+    """Locate the OCR text div: (index of its opening tag, index of its </div>), or (-1, -1)."""
+    start = content.find(OCR_DIV_OPEN)
+    if start == -1:
+        return -1, -1
+    end = content.find('</div>', start + len(OCR_DIV_OPEN))
+    if end == -1:
+        return -1, -1
+    return start, end
 
 
-def update_ocr_html(post_path: Path, new_html: str) -> bool:
-    """Replace the OCR text div content in a post HTML file."""
+def extract_ocr_html(post_path: Path) -> tuple[str, str]:
+    """Read a post HTML file. Returns (file content, OCR text div content)."""
     content = post_path.read_text(encoding='utf-8')
-    pattern = r'(<div class="ocr-text text-gray-800">)\s*(.*?)\s*(</div>)'
-    match = re.search(pattern, content, re.DOTALL)
-    if not match:
+    start, end = find_ocr_div(content)
+    if start == -1:
+        return content, ""
+    return content, content[start + len(OCR_DIV_OPEN):end].strip()
+
+
+def update_ocr_html(post_path: Path, content: str, new_html: str) -> bool:
+    """Replace the OCR text div content in a post, given the content extract_ocr_html read."""
+    start, end = find_ocr_div(content)
+    if start == -1:
         return False
 
     new_content = (
-        content[:match.start()]
-        + match.group(1) + '\n        '
+        content[:start]
+        + OCR_DIV_OPEN + '\n        '
         + new_html + '\n      '
-        + match.group(3)
-        + content[match.end():]
+        + content[end:]
     )
     post_path.write_text(new_content, encoding='utf-8')
     return True
@@ -106,15 +116,41 @@ def clean_with_gemini(client, ocr_html: str, title: str) -> str:
 
     text = response.text.strip()
     # Strip markdown code block wrapper if present
-    if text.startswith("```html"):
-        text = text[7:]
-    if text.startswith("```"):
-        text = text[3:]
-    if text.endswith("```"):
-        text = text[:-3]
+    text = text.removeprefix("```html").removeprefix("```").removesuffix("```")
     return text.strip()
 
 
+def process_post(client, idx: int, total: int, title: str, post_path: Path) -> tuple[list, bool]:
+    """Clean one post's OCR HTML with Gemini. Returns (log lines, whether the post was updated)."""
+    log = [f"\n[{idx+1}/{total}] {title}"]
+
+    # Extract current OCR HTML
+    content, ocr_html = extract_ocr_html(post_path)
+    if not ocr_html or len(ocr_html) < 100:
+        log.append(f"  SKIP: No/minimal OCR content")
+        return log, False
+
+    # Send to Gemini for cleanup
+    log.append(f"  Sending to Gemini for cleanup...")
+    try:
+        cleaned_html = clean_with_gemini(client, ocr_html, title)
+    except Exception as e:
+        log.append(f"  ERROR: {e}")
+        return log, False
+
+    # Sanity check: cleaned version shouldn't be drastically shorter
+    if len(cleaned_html) < len(ocr_html) * 0.5:
+        log.append(f"  WARNING: Cleaned text is {len(cleaned_html)} chars vs original {len(ocr_html)} chars — skipping")
+        return log, False
+
+    # Update the post file
+    if update_ocr_html(post_path, content, cleaned_html):
+        log.append(f"  Done! ({len(ocr_html)} → {len(cleaned_html)} chars)")
+        return log, True
+    log.append(f"  Failed to update HTML")
+    return log, False
+
+
 def main():
     api_key = os.environ.get("GEMINI_API_KEY")
     if not api_key or api_key == "your-key-here":
@@ -131,7 +167,7 @@ def main():
         indices = [int(i) for i in sys.argv[1:]]
         gemini_posts = [gemini_posts[i] for i in indices if i < len(gemini_posts)]
 
-    cleaned = 0
+    jobs = []
     for idx, entry in enumerate(gemini_posts):
         title = entry.get("Title", "Unknown")
         blog_page = entry.get("blog_page", "")
@@ -143,37 +179,20 @@ def main():
             print(f"  SKIP: {blog_page} not found")
             continue
 
-        print(f"\n[{idx+1}/{len(gemini_posts)}] {title}")
-
-        # Extract current OCR HTML
-        ocr_html = extract_ocr_html(post_path)
-        if not ocr_html or len(ocr_html) < 100:
-            print(f"  SKIP: No/minimal OCR content")
-            continue
+        jobs.append((idx, title, post_path))
 
-        # Send to Gemini for cleanup
-        print(f"  Sending to Gemini for cleanup...")
-        try:
-            cleaned_html = clean_with_gemini(client, ocr_html, title)
-        except Exception as e:
-            print(f"  ERROR: {e}")
-            continue
-
-        # Sanity check: cleaned version shouldn't be drastically shorter
-        if len(cleaned_html) < len(ocr_html) * 0.5:
-            print(f"  WARNING: Cleaned text is {len(cleaned_html)} chars vs original {len(ocr_html)} chars — skipping")
-            continue
-
-        # Update the post file
-        if update_ocr_html(post_path, cleaned_html):
-            cleaned += 1
-            print(f"  Done! ({len(ocr_html)} → {len(cleaned_html)} chars)")
-        else:
-            print(f"  Failed to update HTML")
-
-        # Brief pause between requests
-        if idx < len(gemini_posts) - 1:
-            time.sleep(2)
+    # Requests are network-bound, so keep a few in flight; 429s still back off
+    # inside clean_with_gemini. Logs are printed per post, in order.
+    cleaned = 0
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = [
+            executor.submit(process_post, client, idx, len(gemini_posts), title, post_path)
+            for idx, title, post_path in jobs
+        ]
+        for future in futures:
+            log, updated = future.result()
+            print("\n".join(log))
+            cleaned += updated
 
     print(f"\nAll done! Cleaned {cleaned}/{len(gemini_posts)} posts.")
 
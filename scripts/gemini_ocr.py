@@ -5,12 +5,16 @@ Downloads PDFs from S3, sends to Gemini for text extraction,
 and updates the post HTML files with clean extracted text.
 """
 
+import hashlib
 import os
-import re
+import random
 import sys
 import time
 import tempfile
+import threading
 import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from dotenv import load_dotenv
 from pypdf import PdfReader, PdfWriter
@@ -19,9 +23,22 @@ from pypdf import PdfReader, PdfWriter
 load_dotenv(Path(__file__).resolve().parent.parent / ".env")
 
 from google import genai
+from google.genai import errors as genai_errors
 
 POSTS_DIR = Path(__file__).resolve().parent.parent / "posts"
 
+# Posts processed concurrently
+MAX_WORKERS = 4
+
+GEMINI_MODEL = "gemini-3-flash-preview"
+
+# Extracted HTML keyed by PDF bytes + prompt + model, so re-runs skip the API.
+# Pass --no-cache to force re-extraction.
+OCR_CACHE_DIR = POSTS_DIR.parent / ".ocr_cache"
+USE_CACHE = True
+
+OCR_DIV_OPEN = '<div class="ocr-text text-gray-800">'
+
 GEMINI_PROMPT = """Extract all the text from this PDF document. This is a historical speech, memo, or testimony by Admiral Hyman G. Rickover (1950s-1980s).
 
 Rules:
@@ -256,30 +273,45 @@ POSTS = [
 ]
 
 
-def download_pdf(url: str, dest: str) -> bool:
-    """Download a PDF from S3."""
-    resp = requests.get(url, timeout=120)
-    if resp.status_code == 200:
+# Shared across download threads so S3 connections are reused
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(pool_maxsize=16))
+
+
+def download_pdf(url: str, dest: str, log: list) -> bool:
+    """Download a PDF from S3, streaming it to disk. Errors go to the post's log."""
+    with SESSION.get(url, timeout=120, stream=True) as resp:
+        if resp.status_code != 200:
+            log.append(f"  ERROR: HTTP {resp.status_code} downloading {url}")
+            return False
         with open(dest, 'wb') as f:
-            f.write(resp.content)
-        return True
-    print(f"  ERROR: HTTP {resp.status_code} downloading {url}")
-    return False
+            for chunk in resp.iter_content(chunk_size=65536):
+                f.write(chunk)
+    return True
 
 
 CHUNK_SIZE = 7  # Max pages per chunk
+CHUNK_WORKERS = 4  # Chunks of one PDF in flight at once
+# Posts and their chunks share this cap, so at most 4 generate_content calls
+# run at a time however the two pools nest
+GEMINI_CONCURRENCY = 4
+GEMINI_SLOTS = threading.BoundedSemaphore(GEMINI_CONCURRENCY)
+# PDFs (or chunks) are sent inline rather than through the Files API when the
+# request fits Gemini's 20MB inline cap. Inline data travels base64-encoded,
+# so a PDF costs 4/3 of its size; leave headroom for the JSON envelope
+INLINE_REQUEST_MAX_BYTES = 19 * 1000 * 1000
 
 
-def split_pdf(pdf_path: str, chunk_size: int = CHUNK_SIZE) -> list:
-    """Split a PDF into chunks, returning list of (chunk_path, start_page, end_page)."""
-    reader = PdfReader(pdf_path)
-    total_pages = len(reader.pages)
+def inline_request_size(pdf_bytes: bytes, prompt: str) -> int:
+    """Approximate size of an inline request: base64 PDF plus the prompt."""
+    return -(-len(pdf_bytes) // 3) * 4 + len(prompt.encode('utf-8'))
 
-    if total_pages <= chunk_size:
-        return [(pdf_path, 1, total_pages)]
+
+def split_pdf(reader: PdfReader, tmpdir: str, chunk_size: int = CHUNK_SIZE) -> list:
+    """Split an opened PDF into chunk files in tmpdir, returning list of (chunk_path, start_page, end_page)."""
+    total_pages = len(reader.pages)
 
     chunks = []
-    tmpdir = tempfile.mkdtemp()
     for start in range(0, total_pages, chunk_size):
         end = min(start + chunk_size, total_pages)
         writer = PdfWriter()
@@ -293,124 +325,299 @@ def split_pdf(pdf_path: str, chunk_size: int = CHUNK_SIZE) -> list:
     return chunks
 
 
-def extract_chunk_with_gemini(client, pdf_path: str, title: str, page_info: str = "") -> str:
-    """Upload a PDF (or chunk) to Gemini and extract clean HTML text."""
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Exponential backoff (base, 2*base, 4*base, ... up to cap) with +/-25% jitter."""
+    return min(cap, base * 2 ** attempt) * random.uniform(0.75, 1.25)
+
+
+# After a 429, no worker calls Gemini again before this time.time() deadline
+_RETRY_NOT_BEFORE = 0.0
+_RETRY_LOCK = threading.Lock()
+
+
+def retry_after_seconds(error) -> float:
+    """Seconds from a rate-limit error's Retry-After header, or 0 if it sent none."""
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    try:
+        return float(headers.get("Retry-After"))
+    except (AttributeError, TypeError, ValueError):
+        return 0.0
+
+
+def defer_gemini_calls(wait: float) -> float:
+    """Push the shared retry deadline at least wait seconds out.
+
+    Returns the seconds until the deadline now in force, which an earlier 429
+    may have set later still. wait is never shortened, so a server's
+    Retry-After is honoured; wait_for_retry_window staggers the release.
+    """
+    global _RETRY_NOT_BEFORE
+    with _RETRY_LOCK:
+        now = time.time()
+        _RETRY_NOT_BEFORE = max(_RETRY_NOT_BEFORE, now + wait)
+        return _RETRY_NOT_BEFORE - now
+
+
+def wait_for_retry_window():
+    """Block until the shared retry deadline has passed, staggering the release."""
+    delay = _RETRY_NOT_BEFORE - time.time()
+    if delay > 0:
+        time.sleep(delay + random.uniform(0, 1))
+
+
+def ocr_cache_path(source_hash, prompt: str) -> Path:
+    """Cache file for a source PDF extracted with the given prompt and GEMINI_MODEL.
+
+    source_hash is a sha256 of the original PDF's bytes. Chunks are keyed on it
+    too, not on the bytes split_pdf writes: pypdf re-serialises each chunk with
+    a fresh /ID, so those differ from run to run. A chunk's prompt names its
+    page range, which keeps chunk entries apart.
+    """
+    digest = source_hash.copy()
+    digest.update(prompt.encode('utf-8'))
+    digest.update(GEMINI_MODEL.encode('utf-8'))
+    return OCR_CACHE_DIR / f"{digest.hexdigest()}.html"
+
+
+def write_ocr_cache(cache_path: Path, text: str):
+    """Write a cache entry atomically, so concurrent workers never see a partial file."""
+    cache_path.parent.mkdir(exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=cache_path.parent, suffix=".tmp")
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, cache_path)
+
+
+def delete_upload(client, uploaded):
+    """Delete an uploaded file from Gemini, ignoring failures."""
+    try:
+        client.files.delete(name=uploaded.name)
+    except Exception:
+        pass
+
+
+# ACTIVE uploads an interrupted run left behind, by display name. Listed on the
+# first upload (None until then); each is claimed by at most one upload_pdf call
+_LEFTOVER_UPLOADS = None
+_LEFTOVER_LOCK = threading.Lock()
+
+
+def claim_leftover_upload(client, display_name: str, log: list):
+    """Take a still-active upload an earlier run left under display_name, if any.
+
+    Every upload is deleted once its generate call finishes, so these only
+    exist after a crash or interrupt. Most posts are cached or sent inline, so
+    the one listing per run waits for the first real upload; if it fails,
+    uploads go ahead without reuse.
+    """
+    global _LEFTOVER_UPLOADS
+    with _LEFTOVER_LOCK:
+        if _LEFTOVER_UPLOADS is None:
+            _LEFTOVER_UPLOADS = {}
+            try:
+                for existing in client.files.list():
+                    name = existing.display_name or ""
+                    if name.startswith("rickover-") and getattr(existing.state, "name", None) == "ACTIVE":
+                        _LEFTOVER_UPLOADS[name] = existing
+            except Exception as e:
+                log.append(f"  WARNING: Could not list leftover Gemini uploads: {e}")
+        return _LEFTOVER_UPLOADS.pop(display_name, None)
+
+
+def upload_pdf(client, pdf_path: str, display_name: str, title: str, log: list):
+    """Upload a PDF to the Gemini Files API and wait until it is ACTIVE.
+
+    A leftover upload with the same display_name is reused instead.
+    """
+    existing = claim_leftover_upload(client, display_name, log)
+    if existing is not None:
+        return existing
+
+    uploaded = client.files.upload(file=pdf_path, config={"display_name": display_name})
+    poll = 0
+    while uploaded.state.name == "PROCESSING":
+        time.sleep(backoff_delay(poll, base=0.25, cap=4))
+        poll += 1
+        uploaded = client.files.get(name=uploaded.name)
+    if uploaded.state.name == "FAILED":
+        delete_upload(client, uploaded)
+        raise RuntimeError(f"Gemini file upload failed for {title}")
+    return uploaded
+
+
+def extract_chunk_with_gemini(client, pdf_path: str, title: str, log: list, page_info: str = "",
+                              source_hash=None) -> str:
+    """Upload a PDF (or chunk) to Gemini and extract clean HTML text.
+
+    For a chunk, pass its page_info and the source PDF's sha256 as source_hash.
+    Progress goes to log, the post's buffered log lines.
+    """
     if page_info:
         # Shorter prompt for chunks — long prompt + multi-page chunks can cause empty responses
         prompt = "Extract all text from this PDF as clean HTML paragraphs using <p> tags. Remove page numbers, headers/footers, and boilerplate. Fix obvious OCR errors. Output only <p> tags, no markdown or commentary. This is " + page_info + "."
     else:
         prompt = GEMINI_PROMPT
 
+    with open(pdf_path, 'rb') as f:
+        pdf_bytes = f.read()
+    if source_hash is None:
+        source_hash = hashlib.sha256(pdf_bytes)
+    cache_path = ocr_cache_path(source_hash, prompt)
+    if USE_CACHE and cache_path.exists():
+        return cache_path.read_text(encoding='utf-8')
+
+    # Uploads are named by source PDF and page range, so a leftover from an
+    # interrupted run can be matched to this chunk
+    upload_key = source_hash.copy()
+    upload_key.update(page_info.encode('utf-8'))
+    display_name = "rickover-" + upload_key.hexdigest()[:16]
+
+    # Small PDFs go inline in the request: one call instead of upload + poll + generate + delete
+    inline = inline_request_size(pdf_bytes, prompt) <= INLINE_REQUEST_MAX_BYTES
+
     # Retry with fresh upload each attempt (file refs can go stale)
     max_retries = 5
     text = ""
     for attempt in range(max_retries):
         try:
-            uploaded = client.files.upload(file=pdf_path)
-            while uploaded.state.name == "PROCESSING":
-                time.sleep(2)
-                uploaded = client.files.get(name=uploaded.name)
-            if uploaded.state.name == "FAILED":
-                raise RuntimeError(f"Gemini file upload failed for {title}")
-
-            response = client.models.generate_content(
-                model="gemini-3-flash-preview",
-                contents=[
-                    genai.types.Part.from_uri(file_uri=uploaded.uri, mime_type="application/pdf"),
-                    prompt,
-                ],
-                config=genai.types.GenerateContentConfig(
-                    temperature=0.1,
-                    max_output_tokens=65536,
-                ),
-            )
-
-            # Clean up uploaded file
+            wait_for_retry_window()
+            if inline:
+                uploaded = None
+                pdf_part = genai.types.Part.from_bytes(data=pdf_bytes, mime_type="application/pdf")
+            else:
+                uploaded = upload_pdf(client, pdf_path, display_name, title, log)
+                pdf_part = genai.types.Part.from_uri(file_uri=uploaded.uri, mime_type="application/pdf")
+
             try:
-                client.files.delete(name=uploaded.name)
-            except Exception:
-                pass
+                with GEMINI_SLOTS:
+                    wait_for_retry_window()
+                    response = client.models.generate_content(
+                        model=GEMINI_MODEL,
+                        contents=[pdf_part, prompt],
+                        config=genai.types.GenerateContentConfig(
+                            temperature=0.1,
+                            max_output_tokens=65536,
+                        ),
+                    )
+            finally:
+                # Clean up uploaded file, even if generation failed
+                if uploaded is not None:
+                    delete_upload(client, uploaded)
 
             text = response.text.strip() if response.text else ""
             if len(text) < 50 and attempt < max_retries - 1:
-                print(f"  WARNING: Empty/short response ({len(text)} chars), re-uploading and retrying (attempt {attempt+1}/{max_retries})...")
+                log.append(f"  WARNING: Empty/short response ({len(text)} chars), re-uploading and retrying (attempt {attempt+1}/{max_retries})...")
                 time.sleep(10)
                 continue
             break
-        except Exception as e:
-            if "429" in str(e) and attempt < max_retries - 1:
-                wait = 30 * (attempt + 1)
-                print(f"  Rate limited, waiting {wait}s (attempt {attempt+1}/{max_retries})...")
-                time.sleep(wait)
+        except genai_errors.ClientError as e:
+            if e.code == 429 and attempt < max_retries - 1:
+                # Hold back every worker, not just this one, until the window passes
+                wait = defer_gemini_calls(retry_after_seconds(e) or backoff_delay(attempt, base=5, cap=60))
+                log.append(f"  Rate limited, waiting {wait:.0f}s (attempt {attempt+1}/{max_retries})...")
             else:
                 raise
 
     if len(text) < 50:
-        print(f"  ERROR: Chunk returned only {len(text)} chars after {max_retries} retries")
+        log.append(f"  ERROR: Chunk returned only {len(text)} chars after {max_retries} retries")
     # Strip markdown code block wrapper if present
-    if text.startswith("```html"):
-        text = text[7:]
-    if text.startswith("```"):
-        text = text[3:]
-    if text.endswith("```"):
-        text = text[:-3]
-    return text.strip()
+    text = text.removeprefix("```html").removeprefix("```").removesuffix("```")
+    text = text.strip()
+    if len(text) >= 50:
+        write_ocr_cache(cache_path, text)
+    return text
 
 
-def extract_text_with_gemini(client, pdf_path: str, title: str) -> str:
+def extract_text_with_gemini(client, pdf_path: str, title: str, log: list) -> str:
     """Extract text from PDF, chunking if over CHUNK_SIZE pages."""
     reader = PdfReader(pdf_path)
     total_pages = len(reader.pages)
 
     if total_pages <= CHUNK_SIZE:
-        print(f"  {total_pages} pages — single pass")
-        return extract_chunk_with_gemini(client, pdf_path, title)
+        log.append(f"  {total_pages} pages — single pass")
+        return extract_chunk_with_gemini(client, pdf_path, title, log)
 
     # Split into chunks
-    print(f"  {total_pages} pages — chunking into {CHUNK_SIZE}-page segments")
-    chunks = split_pdf(pdf_path)
-    all_text = []
+    log.append(f"  {total_pages} pages — chunking into {CHUNK_SIZE}-page segments")
+    with open(pdf_path, 'rb') as f:
+        source_hash = hashlib.sha256(f.read())
 
-    for chunk_path, start, end in chunks:
+    def extract_chunk(chunk):
+        chunk_path, start, end = chunk
         page_info = f"pages {start}-{end} of {total_pages}"
-        print(f"  Processing {page_info}...")
-        chunk_text = extract_chunk_with_gemini(client, chunk_path, title, page_info)
-        all_text.append(chunk_text)
-        # Clean up chunk file if it's not the original
-        if chunk_path != pdf_path:
-            os.remove(chunk_path)
-        time.sleep(2)  # Brief pause between chunks
+        log.append(f"  Processing {page_info}...")
+        return extract_chunk_with_gemini(client, chunk_path, title, log, page_info, source_hash)
+
+    # Chunk files are removed with the directory. Chunks are independent
+    # requests; map keeps them in page order
+    with tempfile.TemporaryDirectory() as tmpdir:
+        chunks = split_pdf(reader, tmpdir)
+        with ThreadPoolExecutor(max_workers=CHUNK_WORKERS) as executor:
+            all_text = list(executor.map(extract_chunk, chunks))
 
     return "\n\n".join(all_text)
 
 
-def update_post_html(blog_page: str, new_ocr_html: str) -> bool:
+def update_post_html(blog_page: str, new_ocr_html: str, log: list) -> bool:
     """Replace the OCR text div content in a post HTML file."""
     filepath = Path(__file__).resolve().parent.parent / blog_page
     if not filepath.exists():
-        print(f"  WARNING: {filepath} does not exist")
+        log.append(f"  WARNING: {filepath} does not exist")
         return False
 
-    content = filepath.read_text(encoding='utf-8')
+    # Read and rewrite through one handle
+    with open(filepath, 'r+', encoding='utf-8') as f:
+        content = f.read()
+
+        # Find the OCR text div; it never nests, so it ends at the next </div>
+        start = content.find(OCR_DIV_OPEN)
+        end = content.find('</div>', start + len(OCR_DIV_OPEN)) if start != -1 else -1
+        if end == -1:
+            log.append(f"  WARNING: No ocr-text div found in {blog_page}")
+            return False
+
+        # Replace content
+        new_content = (
+            content[:start]
+            + OCR_DIV_OPEN + '\n        '
+            + new_ocr_html + '\n      '
+            + content[end:]
+        )
+
+        f.seek(0)
+        f.write(new_content)
+        f.truncate()
+    return True
 
-    # Find the OCR text div
-    pattern = r'(<div class="ocr-text text-gray-800">)\s*(.*?)\s*(</div>)'
-    match = re.search(pattern, content, re.DOTALL)
-    if not match:
-        print(f"  WARNING: No ocr-text div found in {blog_page}")
-        return False
 
-    # Replace content
-    new_content = (
-        content[:match.start()]
-        + match.group(1) + '\n        '
-        + new_ocr_html + '\n      '
-        + match.group(3)
-        + content[match.end():]
-    )
+def process_post(client, tmpdir: str, i: int, post: dict) -> list:
+    """Download, OCR and update one post. Returns its log lines."""
+    log = []
+
+    # Download PDF
+    pdf_path = os.path.join(tmpdir, f"doc_{i}.pdf")
+    log.append(f"  Downloading PDF...")
+    if not download_pdf(post["file_pdf"], pdf_path, log):
+        return log
+
+    # Extract text with Gemini
+    log.append(f"  Sending to Gemini...")
+    try:
+        ocr_html = extract_text_with_gemini(client, pdf_path, post["title"], log)
+    except Exception as e:
+        log.append(f"  ERROR: Gemini extraction failed: {e}")
+        return log
+
+    # Update post HTML
+    log.append(f"  Updating {post['blog_page']}...")
+    if update_post_html(post["blog_page"], ocr_html, log):
+        log.append(f"  Done!")
+    else:
+        log.append(f"  Failed to update HTML")
 
-    filepath.write_text(new_content, encoding='utf-8')
-    return True
+    # Clean up PDF
+    os.remove(pdf_path)
+    return log
 
 
 def main():
@@ -421,47 +628,33 @@ def main():
 
     client = genai.Client(api_key=api_key)
 
+    global USE_CACHE
+    args = sys.argv[1:]
+    if "--no-cache" in args:
+        args.remove("--no-cache")
+        USE_CACHE = False
+
     # Allow passing specific indices to process (e.g., "python gemini_ocr.py 0 5 10")
-    if len(sys.argv) > 1:
-        indices = [int(i) for i in sys.argv[1:]]
+    if args:
+        indices = [int(i) for i in args]
         posts_to_process = [(i, POSTS[i]) for i in indices if i < len(POSTS)]
     else:
         posts_to_process = list(enumerate(POSTS))
 
     print(f"Processing {len(posts_to_process)} posts with Gemini...")
 
+    # Each post is download + upload + generate, all network-bound, so run a
+    # few at once; a 429 pauses them all inside extract_chunk_with_gemini
     with tempfile.TemporaryDirectory() as tmpdir:
-        for idx, (i, post) in enumerate(posts_to_process):
-            title = post["title"]
-            print(f"\n[{idx+1}/{len(posts_to_process)}] {title}")
-
-            # Download PDF
-            pdf_path = os.path.join(tmpdir, f"doc_{i}.pdf")
-            print(f"  Downloading PDF...")
-            if not download_pdf(post["file_pdf"], pdf_path):
-                continue
-
-            # Extract text with Gemini
-            print(f"  Sending to Gemini...")
-            try:
-                ocr_html = extract_text_with_gemini(client, pdf_path, title)
-            except Exception as e:
-                print(f"  ERROR: Gemini extraction failed: {e}")
-                continue
-
-            # Update post HTML
-            print(f"  Updating {post['blog_page']}...")
-            if update_post_html(post["blog_page"], ocr_html):
-                print(f"  Done!")
-            else:
-                print(f"  Failed to update HTML")
-
-            # Clean up PDF
-            os.remove(pdf_path)
-
-            # Rate limit: brief pause between requests
-            if idx < len(posts_to_process) - 1:
-                time.sleep(2)
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            futures = [
+                executor.submit(process_post, client, tmpdir, i, post)
+                for i, post in posts_to_process
+            ]
+            for idx, ((i, post), future) in enumerate(zip(posts_to_process, futures)):
+                log = future.result()
+                print(f"\n[{idx+1}/{len(posts_to_process)}] {post['title']}")
+                print("\n".join(log))
 
     print(f"\nAll done! Processed {len(posts_to_process)} posts.")
 
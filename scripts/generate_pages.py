@@ -1,21 +1,123 @@
 #!/usr/bin/env python3
 """Generate blog.html index and individual post pages from manifest.json."""
 
-import json
 import html
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 
+from manifest_io import dump_manifest, load_manifest
+
 ROOT_DIR = Path(__file__).resolve().parent.parent
 MANIFEST_PATH = ROOT_DIR / "manifest.json"
 POSTS_DIR = ROOT_DIR / "posts"
 
-
+# A post page; filled in with str.format_map, so literal braces are doubled
+_POST_TEMPLATE = "\n".join([
+    '<!DOCTYPE html>',
+    '<html lang="en">',
+    '<head>',
+    '  <meta charset="UTF-8">',
+    '  <meta name="viewport" content="width=device-width, initial-scale=1.0">',
+    '  <title>{title} — The Rickover Corpus</title>',
+    '  <meta name="description" content="{meta_desc}">',
+    '  <link href="https://cdn.jsdelivr.net/npm/tailwindcss@2.2.19/dist/tailwind.min.css" rel="stylesheet">',
+    '  <link rel="icon" type="image/png" href="/assets/rickover_favicon.png" sizes="256x256">',
+    '  <style>',
+    '    a {{ color: #1d4ed8; text-decoration: underline; }}',
+    '    a:hover {{ color: #1e40af; }}',
+    '    .ocr-text p {{ margin-bottom: 1rem; line-height: 1.75; }}',
+    '  </style>',
+    '  <!-- Google tag (gtag.js) -->',
+    '  <script async src="https://www.googletagmanager.com/gtag/js?id=G-M0H8BLJN0S"></script>',
+    '  <script>',
+    '    window.dataLayer = window.dataLayer || [];',
+    '    function gtag(){{dataLayer.push(arguments);}}',
+    "    gtag('js', new Date());",
+    "    gtag('config', 'G-M0H8BLJN0S');",
+    '  </script>',
+    '</head>',
+    '<body class="bg-gray-50 text-gray-900 font-sans">',
+    '',
+    '  <nav class="max-w-3xl mx-auto px-4 py-6 flex space-x-4 text-sm">',
+    '    <a href="/index.html">&larr; Archive</a>',
+    '    <a href="/blog.html">&larr; Blog Index</a>',
+    '  </nav>',
+    '',
+    '  <article class="max-w-3xl mx-auto px-4 pb-12">',
+    '    <header class="mb-8">',
+    '      <h1 class="text-3xl font-bold tracking-tight mb-3">{title}</h1>',
+    '      <div class="flex flex-wrap gap-3 text-sm text-gray-600 mb-4">',
+    '        <span class="bg-gray-200 px-2 py-1 rounded">{year}</span>',
+    '        <span class="bg-blue-100 text-blue-800 px-2 py-1 rounded">{doc_type}</span>',
+    '        {source_line}',
+    '      </div>',
+    '      <div class="flex space-x-4 text-sm">',
+    '        <a href="{pdf_url}" target="_blank">View Original PDF</a>',
+    '        {ocr_link}',
+    '      </div>',
+    '    </header>',
+    '',
+    '    <section class="bg-white border border-gray-200 rounded-lg p-6 mb-8 shadow-sm">',
+    '      <h2 class="text-lg font-semibold mb-2">Summary</h2>',
+    '      <p class="text-gray-700 leading-relaxed">{summary}</p>',
+    '    </section>',
+    '',
+    '    <section>',
+    '      <h2 class="text-lg font-semibold mb-4">Full Text (OCR)</h2>',
+    '      <div class="ocr-text text-gray-800">',
+    '        {ocr_placeholder}',
+    '      </div>',
+    '    </section>',
+    '  </article>',
+    '',
+    '  <footer class="mt-12 border-t border-gray-300 pt-6 pb-8 text-sm max-w-3xl mx-auto px-4 text-center text-gray-600">',
+    '    <p>',
+    '      This project was compiled and digitized by <a href="https://charlesyang.io" target="_blank">Charles Yang</a>',
+    '      under the <a href="https://industrialstrategy.org" target="_blank">Center for Industrial Strategy</a>.',
+    '    </p>',
+    '    <a href="https://www.industrialstrategy.org" target="_blank" class="mt-4 inline-block">',
+    '      <img src="/assets/CIS_logo.png" alt="CIS Logo" class="h-10 w-auto mx-auto"',
+    '           style="clip-path: inset(1px 1px 1px 1px);">',
+    '    </a>',
+    '  </footer>',
+    '',
+    '</body>',
+    '</html>',
+])
+
+# One card in blog.html
+_CARD_TEMPLATE = (
+    '      <a href="{post_url}" class="block bg-white border border-gray-200 rounded-lg p-5 shadow-sm hover:shadow-md transition-shadow no-underline"'
+    ' data-title="{title}"'
+    ' data-summary="{summary}"'
+    ' data-year="{year}"'
+    ' data-type="{doc_type}">\n'
+    '        <div class="flex items-start justify-between mb-2">\n'
+    '          <h2 class="text-lg font-semibold text-gray-900" style="text-decoration:none">{title}</h2>\n'
+    '        </div>\n'
+    '        <div class="flex gap-2 mb-3 text-sm">\n'
+    '          <span class="bg-gray-200 px-2 py-0.5 rounded text-gray-700">{year}</span>\n'
+    '          <span class="bg-blue-100 text-blue-800 px-2 py-0.5 rounded">{doc_type}</span>\n'
+    '        </div>\n'
+    '        <p class="text-sm text-gray-600 leading-relaxed" style="text-decoration:none">{preview}</p>\n'
+    '      </a>'
+)
+
+
+_SLUG_NONWORD_RE = re.compile(r"[^\w\s-]")
+_SLUG_SPACE_RE = re.compile(r"[\s_]+")
+_SLUG_DASHES_RE = re.compile(r"-+")
+
+
+@lru_cache(maxsize=None)
 def slugify(title: str) -> str:
     slug = title.lower()
-    slug = re.sub(r"[^\w\s-]", "", slug)
-    slug = re.sub(r"[\s_]+", "-", slug)
-    slug = re.sub(r"-+", "-", slug)
+    slug = _SLUG_NONWORD_RE.sub("", slug)
+    slug = _SLUG_SPACE_RE.sub("-", slug)
+    slug = _SLUG_DASHES_RE.sub("-", slug)
     return slug.strip("-")[:120]
 
 
@@ -27,7 +129,8 @@ def generate_post(entry: dict) -> str:
     pdf_url = entry.get("file_pdf", "")
     ocr_url = entry.get("file_OCR", "")
     source = entry.get("Source", "")
-    meta_desc = summary[:160].replace('"', "&quot;")
+    # summary is already escaped, so it has no bare " left to replace
+    meta_desc = summary[:160]
 
     if source.startswith("http"):
         source_html = '<a href="' + html.escape(source) + '" target="_blank" class="text-blue-600 underline">' + html.escape(source) + '</a>'
@@ -46,79 +149,34 @@ def generate_post(entry: dict) -> str:
         'or <a href="' + html.escape(pdf_url) + '" target="_blank">view the original PDF</a>.</p>'
     )
 
-    parts = [
-        '<!DOCTYPE html>',
-        '<html lang="en">',
-        '<head>',
-        '  <meta charset="UTF-8">',
-        '  <meta name="viewport" content="width=device-width, initial-scale=1.0">',
-        '  <title>' + title + ' — The Rickover Corpus</title>',
-        '  <meta name="description" content="' + meta_desc + '">',
-        '  <link href="https://cdn.jsdelivr.net/npm/tailwindcss@2.2.19/dist/tailwind.min.css" rel="stylesheet">',
-        '  <link rel="icon" type="image/png" href="/assets/rickover_favicon.png" sizes="256x256">',
-        '  <style>',
-        '    a { color: #1d4ed8; text-decoration: underline; }',
-        '    a:hover { color: #1e40af; }',
-        '    .ocr-text p { margin-bottom: 1rem; line-height: 1.75; }',
-        '  </style>',
-        '  <!-- Google tag (gtag.js) -->',
-        '  <script async src="https://www.googletagmanager.com/gtag/js?id=G-M0H8BLJN0S"></script>',
-        '  <script>',
-        '    window.dataLayer = window.dataLayer || [];',
-        '    function gtag(){dataLayer.push(arguments);}',
-        "    gtag('js', new Date());",
-        "    gtag('config', 'G-M0H8BLJN0S');",
-        '  </script>',
-        '</head>',
-        '<body class="bg-gray-50 text-gray-900 font-sans">',
-        '',
-        '  <nav class="max-w-3xl mx-auto px-4 py-6 flex space-x-4 text-sm">',
-        '    <a href="/index.html">&larr; Archive</a>',
-        '    <a href="/blog.html">&larr; Blog Index</a>',
-        '  </nav>',
-        '',
-        '  <article class="max-w-3xl mx-auto px-4 pb-12">',
-        '    <header class="mb-8">',
-        '      <h1 class="text-3xl font-bold tracking-tight mb-3">' + title + '</h1>',
-        '      <div class="flex flex-wrap gap-3 text-sm text-gray-600 mb-4">',
-        '        <span class="bg-gray-200 px-2 py-1 rounded">' + str(year) + '</span>',
-        '        <span class="bg-blue-100 text-blue-800 px-2 py-1 rounded">' + doc_type + '</span>',
-        '        ' + source_line,
-        '      </div>',
-        '      <div class="flex space-x-4 text-sm">',
-        '        <a href="' + html.escape(pdf_url) + '" target="_blank">View Original PDF</a>',
-        '        ' + ocr_link,
-        '      </div>',
-        '    </header>',
-        '',
-        '    <section class="bg-white border border-gray-200 rounded-lg p-6 mb-8 shadow-sm">',
-        '      <h2 class="text-lg font-semibold mb-2">Summary</h2>',
-        '      <p class="text-gray-700 leading-relaxed">' + summary + '</p>',
-        '    </section>',
-        '',
-        '    <section>',
-        '      <h2 class="text-lg font-semibold mb-4">Full Text (OCR)</h2>',
-        '      <div class="ocr-text text-gray-800">',
-        '        ' + ocr_placeholder,
-        '      </div>',
-        '    </section>',
-        '  </article>',
-        '',
-        '  <footer class="mt-12 border-t border-gray-300 pt-6 pb-8 text-sm max-w-3xl mx-auto px-4 text-center text-gray-600">',
-        '    <p>',
-        '      This project was compiled and digitized by <a href="https://charlesyang.io" target="_blank">Charles Yang</a>',
-        '      under the <a href="https://industrialstrategy.org" target="_blank">Center for Industrial Strategy</a>.',
-        '    </p>',
-        '    <a href="https://www.industrialstrategy.org" target="_blank" class="mt-4 inline-block">',
-        '      <img src="/assets/CIS_logo.png" alt="CIS Logo" class="h-10 w-auto mx-auto"',
-        '           style="clip-path: inset(1px 1px 1px 1px);">',
-        '    </a>',
-        '  </footer>',
-        '',
-        '</body>',
-        '</html>',
-    ]
-    return "\n".join(parts)
+    return _POST_TEMPLATE.format_map({
+        "title": title,
+        "meta_desc": meta_desc,
+        "year": year,
+        "doc_type": doc_type,
+        "source_line": source_line,
+        "pdf_url": html.escape(pdf_url),
+        "ocr_link": ocr_link,
+        "summary": summary,
+        "ocr_placeholder": ocr_placeholder,
+    })
+
+
+def write_if_changed(path: Path, data: bytes) -> bool:
+    """Atomically write data to path unless the file already holds exactly that."""
+    try:
+        if path.read_bytes() == data:
+            return False
+    except FileNotFoundError:
+        pass
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+    return True
+
+
+def write_post(post_path: Path, entry: dict) -> bool:
+    return write_if_changed(post_path, generate_post(entry).encode("utf-8"))
 
 
 def generate_blog_index(entries: list) -> str:
@@ -130,27 +188,22 @@ def generate_blog_index(entries: list) -> str:
         year = entry.get("Year", "Unknown")
         doc_type = html.escape(entry.get("Type", "Document"))
         summary = entry.get("Summary", "")
-        preview = html.escape(summary[:200]) + ("..." if len(summary) > 200 else "")
+        # Escaping is per character, so the 300-char data-summary extends the
+        # escaped 200-char preview instead of escaping that text again
+        preview_text = html.escape(summary[:200])
+        summary_attr = preview_text + html.escape(summary[200:300])
+        preview = preview_text + ("..." if len(summary) > 200 else "")
         slug = slugify(entry.get("Title", "untitled"))
         post_url = "posts/" + slug + ".html"
 
-        card = (
-            '      <a href="' + post_url + '" class="block bg-white border border-gray-200 rounded-lg p-5 shadow-sm hover:shadow-md transition-shadow no-underline"'
-            ' data-title="' + title + '"'
-            ' data-summary="' + html.escape(summary[:300]) + '"'
-            ' data-year="' + str(year) + '"'
-            ' data-type="' + doc_type + '">\n'
-            '        <div class="flex items-start justify-between mb-2">\n'
-            '          <h2 class="text-lg font-semibold text-gray-900" style="text-decoration:none">' + title + '</h2>\n'
-            '        </div>\n'
-            '        <div class="flex gap-2 mb-3 text-sm">\n'
-            '          <span class="bg-gray-200 px-2 py-0.5 rounded text-gray-700">' + str(year) + '</span>\n'
-            '          <span class="bg-blue-100 text-blue-800 px-2 py-0.5 rounded">' + doc_type + '</span>\n'
-            '        </div>\n'
-            '        <p class="text-sm text-gray-600 leading-relaxed" style="text-decoration:none">' + preview + '</p>\n'
-            '      </a>'
-        )
-        cards.append(card)
+        cards.append(_CARD_TEMPLATE.format_map({
+            "post_url": post_url,
+            "title": title,
+            "summary": summary_attr,
+            "year": year,
+            "doc_type": doc_type,
+            "preview": preview,
+        }))
 
     cards_html = "\n".join(cards)
 
@@ -271,36 +324,31 @@ def generate_blog_index(entries: list) -> str:
 def main():
     POSTS_DIR.mkdir(exist_ok=True)
 
-    with open(MANIFEST_PATH, "r", encoding="utf-8") as f:
-        manifest = json.load(f)
+    manifest = load_manifest(MANIFEST_PATH.read_bytes())
 
     print(f"Loaded {len(manifest)} entries from manifest.json")
 
-    # Generate individual post pages
-    count = 0
-    for entry in manifest:
-        title = entry.get("Title", "Untitled")
-        slug = slugify(title)
-        post_path = POSTS_DIR / (slug + ".html")
-        post_html = generate_post(entry)
-        post_path.write_text(post_html, encoding="utf-8")
-        count += 1
+    slugs = [slugify(entry.get("Title", "untitled")) for entry in manifest]
 
-    print(f"Generated {count} post pages in posts/")
+    # Generate individual post pages. Pages are independent, so fan out across
+    # cores; keying by path keeps the last entry for a slug, as a serial loop would
+    pages = {POSTS_DIR / (slug + ".html"): entry for slug, entry in zip(slugs, manifest)}
+    with ProcessPoolExecutor() as executor:
+        list(executor.map(write_post, pages, pages.values(), chunksize=8))
+
+    print(f"Generated {len(manifest)} post pages in posts/")
 
     # Generate blog index
     blog_html = generate_blog_index(manifest)
     blog_path = ROOT_DIR / "blog.html"
-    blog_path.write_text(blog_html, encoding="utf-8")
+    write_if_changed(blog_path, blog_html.encode("utf-8"))
     print("Generated blog.html")
 
     # Update manifest with blog_page fields
-    for entry in manifest:
-        slug = slugify(entry.get("Title", "untitled"))
+    for entry, slug in zip(manifest, slugs):
         entry["blog_page"] = "posts/" + slug + ".html"
 
-    with open(MANIFEST_PATH, "w", encoding="utf-8") as f:
-        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    write_if_changed(MANIFEST_PATH, dump_manifest(manifest))
     print("Updated manifest.json with blog_page fields")
 
 
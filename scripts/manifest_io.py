@@ -0,0 +1,22 @@
+"""Read and write manifest.json, shared by the scripts that rewrite it."""
+
+import json
+
+try:
+    import orjson
+except ImportError:  # optional: stdlib json produces the same bytes, just slower
+    orjson = None
+
+
+def load_manifest(raw: bytes) -> list:
+    """Parse manifest.json bytes."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def dump_manifest(data: list) -> bytes:
+    """Serialize the manifest as 2-space indented UTF-8 JSON."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
@@ -8,24 +8,43 @@ blog-style HTML pages for each document.
 Prerequisites:
     brew install tesseract poppler
     pip install pytesseract pdf2image requests Pillow
+    pip install tesserocr  # optional: OCR in-process instead of a tesseract run per page
+
+Optionally, put eng.traineddata from https://github.com/tesseract-ocr/tessdata_fast
+in tessdata_fast/ at the project root to OCR with the faster integer models.
 """
 
 import argparse
-import json
+import hashlib
 import os
 import re
+import subprocess
 import sys
 import logging
+import multiprocessing
 import html
 import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
+from typing import Optional
 from urllib.parse import unquote_plus
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from pdf2image import convert_from_path, pdfinfo_from_path
 from PIL import Image, ImageEnhance, ImageFilter
 import pytesseract
 
+try:
+    import tesserocr
+except ImportError:  # optional: fall back to pytesseract, one tesseract process per page
+    tesserocr = None
+
+from manifest_io import dump_manifest, load_manifest
+
 # ---------------------------------------------------------------------------
 # Configuration
 # ---------------------------------------------------------------------------
@@ -34,6 +53,22 @@ MANIFEST_PATH = ROOT_DIR / "manifest.json"
 OCR_OUTPUT_DIR = ROOT_DIR / "ocr_output"
 POSTS_DIR = ROOT_DIR / "posts"
 
+# Concurrent PDF downloads, run ahead of OCR
+DOWNLOAD_WORKERS = 8
+
+# Integer-quantised LSTM models, about twice as fast as the default tessdata
+# with the same accuracy on clean typescript; used when present
+TESSDATA_FAST_DIR = ROOT_DIR / "tessdata_fast"
+USE_TESSDATA_FAST = (TESSDATA_FAST_DIR / "eng.traineddata").exists()
+
+# 200 dpi is enough for the corpus's typescript and has under half the pixels
+# of 300; pass --dpi 300 for small or degraded print
+DEFAULT_DPI = 200
+
+# A text layer averaging fewer characters per page than this is treated as a
+# scan (or a junk layer) and OCR'd instead
+EMBEDDED_TEXT_MIN_CHARS = 200
+
 LOG_FORMAT = "%(asctime)s  %(levelname)-8s  %(message)s"
 logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
 log = logging.getLogger("pipeline")
@@ -42,30 +77,44 @@ log = logging.getLogger("pipeline")
 # Helpers
 # ---------------------------------------------------------------------------
 
+_SLUG_NONWORD_RE = re.compile(r"[^\w\s-]")
+_SLUG_SPACE_RE = re.compile(r"[\s_]+")
+_SLUG_DASHES_RE = re.compile(r"-+")
+
+
 def slugify(title: str) -> str:
     """Convert a title into a URL-friendly slug."""
     slug = title.lower()
-    slug = re.sub(r"[^\w\s-]", "", slug)
-    slug = re.sub(r"[\s_]+", "-", slug)
-    slug = re.sub(r"-+", "-", slug)
+    slug = _SLUG_NONWORD_RE.sub("", slug)
+    slug = _SLUG_SPACE_RE.sub("-", slug)
+    slug = _SLUG_DASHES_RE.sub("-", slug)
     return slug.strip("-")[:120]
 
 
+# One keep-alive session per process, so successive downloads from the S3
+# bucket reuse the connection instead of a new TCP + TLS handshake each
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=32,
+                                      max_retries=Retry(total=3, backoff_factor=0.3)))
+
+
 def download_pdf(url: str, dest: Path) -> bool:
     """Download a PDF from a public URL. Returns True on success."""
     if dest.exists():
         log.info("  PDF already downloaded: %s", dest.name)
         return True
     try:
-        resp = requests.get(url, timeout=120, stream=True)
-        resp.raise_for_status()
-        with open(dest, "wb") as f:
-            for chunk in resp.iter_content(chunk_size=8192):
-                f.write(chunk)
+        with SESSION.get(url, timeout=120, stream=True) as resp:
+            resp.raise_for_status()
+            with open(dest, "wb") as f:
+                for chunk in resp.iter_content(chunk_size=8192):
+                    f.write(chunk)
         log.info("  Downloaded PDF: %s", dest.name)
         return True
     except Exception as e:
         log.error("  Failed to download %s: %s", url, e)
+        # Don't leave a partial file that would pass for a finished download
+        dest.unlink(missing_ok=True)
         return False
 
 
@@ -81,26 +130,83 @@ def preprocess_image(img: Image.Image) -> Image.Image:
     return img
 
 
-def ocr_pdf(pdf_path: Path, output_txt: Path) -> str:
-    """Convert PDF to images, OCR each page, return full text."""
+# One tesserocr API per OCR thread: it is not thread-safe, and loading the
+# language model is the expensive part, so each thread keeps its own
+_tess = threading.local()
+
+
+def ocr_page(img: Image.Image) -> str:
+    """Preprocess and OCR a single page image."""
+    processed = preprocess_image(img)
+    if tesserocr is None:
+        if USE_TESSDATA_FAST:
+            config = f'--oem 1 --tessdata-dir "{TESSDATA_FAST_DIR}"'
+            return pytesseract.image_to_string(processed, config=config)
+        return pytesseract.image_to_string(processed)
+    api = getattr(_tess, "api", None)
+    if api is None:
+        if USE_TESSDATA_FAST:
+            api = tesserocr.PyTessBaseAPI(path=f"{TESSDATA_FAST_DIR}/", lang="eng",
+                                          oem=tesserocr.OEM.LSTM_ONLY)
+        else:
+            api = tesserocr.PyTessBaseAPI(lang="eng")
+        _tess.api = api
+    api.SetImage(processed)
+    return api.GetUTF8Text()
+
+
+def extract_embedded_text(pdf_path: Path) -> str:
+    """Return the PDF's own text layer in OCR output format, or "" if it has too little."""
+    try:
+        result = subprocess.run(["pdftotext", "-layout", str(pdf_path), "-"],
+                                capture_output=True, timeout=120)
+    except (OSError, subprocess.SubprocessError):
+        return ""
+    if result.returncode != 0:
+        return ""
+    # pdftotext ends every page with a form feed
+    pages = result.stdout.decode("utf-8", errors="replace").split("\f")
+    if pages and not pages[-1].strip():
+        pages.pop()
+    if not pages or sum(len(p.strip()) for p in pages) < EMBEDDED_TEXT_MIN_CHARS * len(pages):
+        return ""
+    return "\n\n--- Page Break ---\n\n".join(pages)
+
+
+def ocr_pdf(pdf_path: Path, output_txt: Path, dpi: int = DEFAULT_DPI, page_workers: int = 1) -> str:
+    """Convert PDF to images, OCR each page, return full text.
+
+    PDFs that already carry a text layer skip OCR and use it directly.
+    Pages are rasterised and OCR'd page_workers at a time. pdftoppm, tesseract
+    and tesserocr all run outside the GIL, so threads are enough to spread them
+    over cores.
+    """
     if output_txt.exists():
         log.info("  OCR already done: %s", output_txt.name)
         return output_txt.read_text(encoding="utf-8")
 
+    embedded = extract_embedded_text(pdf_path)
+    if embedded:
+        output_txt.write_text(embedded, encoding="utf-8")
+        log.info("  Used embedded text layer, skipped OCR -> %s", output_txt.name)
+        return embedded
+
     with tempfile.TemporaryDirectory() as tmpdir:
         try:
-            images = convert_from_path(str(pdf_path), dpi=300, output_folder=tmpdir)
+            # Rasterise straight to grayscale: a third of the bytes to write
+            # and read back, and preprocess_image only wants luminance anyway
+            images = convert_from_path(str(pdf_path), dpi=dpi, output_folder=tmpdir,
+                                       thread_count=page_workers, grayscale=True)
         except Exception as e:
             log.error("  PDF-to-image failed for %s: %s", pdf_path.name, e)
             return ""
 
         pages = []
-        for i, img in enumerate(images, 1):
-            processed = preprocess_image(img)
-            text = pytesseract.image_to_string(processed)
-            pages.append(text)
-            if i % 10 == 0:
-                log.info("    OCR page %d/%d", i, len(images))
+        with ThreadPoolExecutor(max_workers=page_workers) as executor:
+            for i, text in enumerate(executor.map(ocr_page, images), 1):
+                pages.append(text)
+                if i % 10 == 0:
+                    log.info("    OCR page %d/%d", i, len(images))
 
     full_text = "\n\n--- Page Break ---\n\n".join(pages)
     output_txt.write_text(full_text, encoding="utf-8")
@@ -108,51 +214,26 @@ def ocr_pdf(pdf_path: Path, output_txt: Path) -> str:
     return full_text
 
 
+_BLANK_LINES_RE = re.compile(r"\n\s*\n")
+
+
 def format_ocr_text(raw_text: str) -> str:
     """Convert raw OCR text into HTML paragraphs."""
     if not raw_text.strip():
         return "<p class='text-gray-500 italic'>OCR text not available.</p>"
 
-    # Split on page breaks and double newlines
-    raw_text = raw_text.replace("--- Page Break ---", "\n\n")
-    paragraphs = re.split(r"\n\s*\n", raw_text)
-
-    html_parts = []
-    for p in paragraphs:
-        text = p.strip()
-        if not text:
-            continue
-        # Escape HTML entities
-        text = html.escape(text)
-        # Preserve single newlines within a paragraph
-        text = text.replace("\n", "<br>")
-        html_parts.append(f"<p>{text}</p>")
-
-    return "\n".join(html_parts)
-
-
-def generate_post_html(entry: dict, ocr_text: str, slug: str) -> str:
-    """Generate a blog-style HTML page for a single document."""
-    title = html.escape(entry.get("Title", "Untitled"))
-    year = entry.get("Year", "Unknown")
-    doc_type = html.escape(entry.get("Type", "Document"))
-    summary = html.escape(entry.get("Summary", ""))
-    pdf_url = entry.get("file_pdf", "")
-    ocr_url = entry.get("file_OCR", "")
-    source = entry.get("Source", "")
-
-    # Truncate summary for meta description
-    meta_desc = summary[:160].replace('"', "&quot;")
+    # Escape HTML entities once for the whole text; escaping never touches
+    # whitespace, so the paragraph split below is unaffected
+    raw_text = html.escape(raw_text.replace("--- Page Break ---", "\n\n"))
 
-    formatted_text = format_ocr_text(ocr_text)
+    # Split on page breaks and double newlines, preserving single newlines
+    # within a paragraph
+    paragraphs = (p.strip() for p in _BLANK_LINES_RE.split(raw_text))
+    return "\n".join([f"<p>{p.replace(chr(10), '<br>')}</p>" for p in paragraphs if p])
 
-    # Source link: if it's a URL, make it clickable
-    if source.startswith("http"):
-        source_html = f'<a href="{html.escape(source)}" target="_blank" class="text-blue-600 underline">{html.escape(source)}</a>'
-    else:
-        source_html = html.escape(source) if source else ""
 
-    return f"""<!DOCTYPE html>
+# A post page; filled in with str.format_map, so literal braces are doubled
+_POST_TEMPLATE = """<!DOCTYPE html>
 <html lang="en">
 <head>
   <meta charset="UTF-8">
@@ -188,11 +269,11 @@ def generate_post_html(entry: dict, ocr_text: str, slug: str) -> str:
       <div class="flex flex-wrap gap-3 text-sm text-gray-600 mb-4">
         <span class="bg-gray-200 px-2 py-1 rounded">{year}</span>
         <span class="bg-blue-100 text-blue-800 px-2 py-1 rounded">{doc_type}</span>
-        {f'<span>Source: {source_html}</span>' if source else ''}
+        {source_span}
       </div>
       <div class="flex space-x-4 text-sm">
-        <a href="{html.escape(pdf_url)}" target="_blank">View Original PDF</a>
-        {f'<a href="{html.escape(ocr_url)}" target="_blank">View Original TXT</a>' if ocr_url else ''}
+        <a href="{pdf_url}" target="_blank">View Original PDF</a>
+        {ocr_link}
       </div>
     </header>
 
@@ -224,35 +305,42 @@ def generate_post_html(entry: dict, ocr_text: str, slug: str) -> str:
 </html>"""
 
 
-def generate_blog_index(entries: list[dict]):
-    """Generate blog.html — the blog index page listing all documents."""
-    # Sort by year descending, then title
-    sorted_entries = sorted(entries, key=lambda e: (-e.get("Year", 0), e.get("Title", "")))
-
-    cards_html = []
-    for entry in sorted_entries:
-        title = html.escape(entry.get("Title", "Untitled"))
-        year = entry.get("Year", "Unknown")
-        doc_type = html.escape(entry.get("Type", "Document"))
-        summary = entry.get("Summary", "")
-        # Truncate summary for card preview
-        preview = html.escape(summary[:200]) + ("..." if len(summary) > 200 else "")
-        slug = slugify(entry.get("Title", "untitled"))
-        post_url = f"posts/{slug}.html"
-
-        cards_html.append(f"""
-      <a href="{post_url}" class="block bg-white border border-gray-200 rounded-lg p-5 shadow-sm hover:shadow-md transition-shadow no-underline" data-title="{title}" data-summary="{html.escape(summary[:300])}" data-year="{year}" data-type="{doc_type}">
-        <div class="flex items-start justify-between mb-2">
-          <h2 class="text-lg font-semibold text-gray-900" style="text-decoration:none">{title}</h2>
-        </div>
-        <div class="flex gap-2 mb-3 text-sm">
-          <span class="bg-gray-200 px-2 py-0.5 rounded text-gray-700">{year}</span>
-          <span class="bg-blue-100 text-blue-800 px-2 py-0.5 rounded">{doc_type}</span>
-        </div>
-        <p class="text-sm text-gray-600 leading-relaxed" style="text-decoration:none">{preview}</p>
-      </a>""")
+def generate_post_html(entry: dict, ocr_text: str, slug: str) -> str:
+    """Generate a blog-style HTML page for a single document."""
+    title = html.escape(entry.get("Title", "Untitled"))
+    year = entry.get("Year", "Unknown")
+    doc_type = html.escape(entry.get("Type", "Document"))
+    summary = html.escape(entry.get("Summary", ""))
+    pdf_url = entry.get("file_pdf", "")
+    ocr_url = entry.get("file_OCR", "")
+    source = entry.get("Source", "")
+
+    # Truncate summary for meta description
+    meta_desc = summary[:160]
+
+    formatted_text = format_ocr_text(ocr_text)
 
-    blog_html = f"""<!DOCTYPE html>
+    # Source link: if it's a URL, make it clickable
+    if source.startswith("http"):
+        source_html = f'<a href="{html.escape(source)}" target="_blank" class="text-blue-600 underline">{html.escape(source)}</a>'
+    else:
+        source_html = html.escape(source) if source else ""
+
+    return _POST_TEMPLATE.format_map({
+        "title": title,
+        "meta_desc": meta_desc,
+        "year": year,
+        "doc_type": doc_type,
+        "source_span": f'<span>Source: {source_html}</span>' if source else '',
+        "pdf_url": html.escape(pdf_url),
+        "ocr_link": f'<a href="{html.escape(ocr_url)}" target="_blank">View Original TXT</a>' if ocr_url else '',
+        "summary": summary,
+        "formatted_text": formatted_text,
+    })
+
+
+# blog.html is written in pieces: the page head, one card per entry, then the rest
+_BLOG_HEADER = """<!DOCTYPE html>
 <html lang="en">
 <head>
   <meta charset="UTF-8">
@@ -262,16 +350,16 @@ def generate_blog_index(entries: list[dict]):
   <link href="https://cdn.jsdelivr.net/npm/tailwindcss@2.2.19/dist/tailwind.min.css" rel="stylesheet">
   <link rel="icon" type="image/png" href="/assets/rickover_favicon.png" sizes="256x256">
   <style>
-    a {{ color: #1d4ed8; text-decoration: underline; }}
-    a:hover {{ color: #1e40af; }}
-    a.no-underline {{ text-decoration: none; }}
-    a.no-underline:hover {{ text-decoration: none; }}
+    a { color: #1d4ed8; text-decoration: underline; }
+    a:hover { color: #1e40af; }
+    a.no-underline { text-decoration: none; }
+    a.no-underline:hover { text-decoration: none; }
   </style>
   <!-- Google tag (gtag.js) -->
   <script async src="https://www.googletagmanager.com/gtag/js?id=G-M0H8BLJN0S"></script>
   <script>
     window.dataLayer = window.dataLayer || [];
-    function gtag(){{dataLayer.push(arguments);}}
+    function gtag(){dataLayer.push(arguments);}
     gtag('js', new Date());
     gtag('config', 'G-M0H8BLJN0S');
   </script>
@@ -297,7 +385,21 @@ def generate_blog_index(entries: list[dict]):
     <p id="resultCount" class="text-sm text-gray-500 mb-4"></p>
 
     <div id="blogCards" class="space-y-4">
-      {"".join(cards_html)}
+      """
+
+_BLOG_CARD = """
+      <a href="{post_url}" class="block bg-white border border-gray-200 rounded-lg p-5 shadow-sm hover:shadow-md transition-shadow no-underline" data-title="{title}" data-summary="{summary}" data-year="{year}" data-type="{doc_type}">
+        <div class="flex items-start justify-between mb-2">
+          <h2 class="text-lg font-semibold text-gray-900" style="text-decoration:none">{title}</h2>
+        </div>
+        <div class="flex gap-2 mb-3 text-sm">
+          <span class="bg-gray-200 px-2 py-0.5 rounded text-gray-700">{year}</span>
+          <span class="bg-blue-100 text-blue-800 px-2 py-0.5 rounded">{doc_type}</span>
+        </div>
+        <p class="text-sm text-gray-600 leading-relaxed" style="text-decoration:none">{preview}</p>
+      </a>"""
+
+_BLOG_FOOTER = """
     </div>
 
     <p id="noResults" class="hidden text-center text-gray-500 mt-8">No documents match your search.</p>
@@ -316,58 +418,88 @@ def generate_blog_index(entries: list[dict]):
 
   <script src="https://cdn.jsdelivr.net/npm/fuse.js@6.6.2"></script>
   <script>
-    (function() {{
+    (function() {
       const cards = document.querySelectorAll('#blogCards > a');
       const searchInput = document.getElementById('blogSearch');
       const noResults = document.getElementById('noResults');
       const resultCount = document.getElementById('resultCount');
 
       // Build search data from card data attributes
-      const items = Array.from(cards).map((card, i) => ({{
+      const items = Array.from(cards).map((card, i) => ({
         title: card.dataset.title,
         summary: card.dataset.summary,
         year: card.dataset.year,
         type: card.dataset.type,
         index: i,
         element: card
-      }}));
+      }));
 
-      const fuse = new Fuse(items, {{
+      const fuse = new Fuse(items, {
         keys: ['title', 'summary', 'type'],
         threshold: 0.4,
         minMatchCharLength: 2
-      }});
+      });
 
       resultCount.textContent = items.length + ' documents';
 
-      searchInput.addEventListener('input', function() {{
+      searchInput.addEventListener('input', function() {
         const query = this.value.trim();
 
-        if (!query) {{
+        if (!query) {
           cards.forEach(c => c.style.display = '');
           noResults.classList.add('hidden');
           resultCount.textContent = items.length + ' documents';
           return;
-        }}
+        }
 
         const results = fuse.search(query);
         const matchedIndices = new Set(results.map(r => r.item.index));
 
-        cards.forEach((card, i) => {{
+        cards.forEach((card, i) => {
           card.style.display = matchedIndices.has(i) ? '' : 'none';
-        }});
+        });
 
         noResults.classList.toggle('hidden', results.length > 0);
         resultCount.textContent = results.length + ' of ' + items.length + ' documents';
-      }});
-    }})();
+      });
+    })();
   </script>
 
 </body>
 </html>"""
 
+
+def generate_blog_index(entries: list[dict], slugs: list[str]):
+    """Generate blog.html — the blog index page listing all documents.
+
+    slugs holds each entry's post slug, in the same order as entries.
+    """
+    # Sort by year descending, then title
+    sorted_entries = sorted(zip(entries, slugs),
+                            key=lambda pair: (-pair[0].get("Year", 0), pair[0].get("Title", "")))
+
+    # Stream cards to a temp file rather than building the page in memory,
+    # then swap it in so a crash never leaves a truncated blog.html
     blog_path = ROOT_DIR / "blog.html"
-    blog_path.write_text(blog_html, encoding="utf-8")
+    tmp_path = blog_path.with_name(blog_path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(_BLOG_HEADER)
+        for entry, slug in sorted_entries:
+            summary = entry.get("Summary", "")
+            # Escaping is per character, so the 300-char data-summary extends the
+            # escaped 200-char preview instead of escaping that text again
+            preview_text = html.escape(summary[:200])
+            f.write(_BLOG_CARD.format_map({
+                "post_url": f"posts/{slug}.html",
+                "title": html.escape(entry.get("Title", "Untitled")),
+                "summary": preview_text + html.escape(summary[200:300]),
+                "year": entry.get("Year", "Unknown"),
+                "doc_type": html.escape(entry.get("Type", "Document")),
+                # Truncate summary for card preview
+                "preview": preview_text + ("..." if len(summary) > 200 else ""),
+            }))
+        f.write(_BLOG_FOOTER)
+    os.replace(tmp_path, blog_path)
     log.info("Generated blog index: %s", blog_path)
 
 
@@ -384,103 +516,230 @@ def get_page_count(pdf_path: Path) -> int:
         return 0
 
 
+def local_pdf_path(entry: dict) -> Path:
+    """Local download path for a manifest entry with a PDF URL."""
+    # Derive local filename from URL
+    return OCR_OUTPUT_DIR / unquote_plus(entry["file_pdf"].split("/")[-1])
+
+
+def remote_version(url: str) -> str:
+    """The PDF's S3 ETag (or Last-Modified) from a HEAD request, or "" if unavailable."""
+    try:
+        resp = SESSION.head(url, timeout=30, allow_redirects=True)
+        resp.raise_for_status()
+    except Exception as e:
+        log.warning("  HEAD request failed for %s: %s", url, e)
+        return ""
+    return resp.headers.get("ETag", "") or resp.headers.get("Last-Modified", "")
+
+
+def ocr_txt_path(slug: str, kind: str, version: str) -> Path:
+    """OCR text cache file for one version of a document; kind is "etag" or "sha256"."""
+    return OCR_OUTPUT_DIR / f"{slug}.{kind}-{hashlib.sha256(version.encode('utf-8')).hexdigest()[:16]}.txt"
+
+
+def cached_ocr_texts(slug: str) -> list[Path]:
+    """OCR text files already cached for a document, newest first."""
+    return sorted(OCR_OUTPUT_DIR.glob(f"{slug}.*.txt"), key=lambda p: p.stat().st_mtime, reverse=True)
+
+
+def locate_ocr_text(entry: dict, slug: str) -> Optional[Path]:
+    """Where an entry's OCR text is cached, keyed by the PDF's current S3 version.
+
+    A PDF updated on S3 gets a new ETag and is re-OCR'd; an unchanged one is not
+    even downloaded. Text of unknown version, keyed on the PDF's bytes after a
+    failed HEAD or cached under the old <pdf name>.txt scheme, is adopted for
+    the current version. If HEAD fails, any cached text is reused as is.
+    Returns None if there is neither a version nor cached text.
+    """
+    cached = cached_ocr_texts(slug)
+    legacy_txt = local_pdf_path(entry).with_suffix(".txt")
+    if legacy_txt.exists():
+        cached.append(legacy_txt)
+    version = remote_version(entry["file_pdf"])
+    if not version:
+        return cached[0] if cached else None
+    txt_path = ocr_txt_path(slug, "etag", version)
+    if not txt_path.exists():
+        unversioned = [p for p in cached if not p.name.startswith(f"{slug}.etag-")]
+        if unversioned:
+            unversioned[0].replace(txt_path)
+    return txt_path
+
+
+def prefetch_pdf(entry: dict, slug: str) -> Optional[Path]:
+    """Download an entry's PDF ahead of OCR, unless its OCR text is cached.
+
+    Returns the OCR text path from locate_ocr_text.
+    """
+    if not entry.get("file_pdf"):
+        return None
+    txt_path = locate_ocr_text(entry, slug)
+    if txt_path is None or not txt_path.exists():
+        download_pdf(entry["file_pdf"], local_pdf_path(entry))
+    return txt_path
+
+
+def pdf_digest(pdf_path: Path) -> str:
+    """SHA-256 of a PDF's bytes."""
+    digest = hashlib.sha256()
+    with open(pdf_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def process_entry(task: tuple[int, dict, str, Optional[Path]], total: int, max_pages: int = 0,
+                  dpi: int = DEFAULT_DPI, page_workers: int = 1) -> tuple[dict, str]:
+    """Download, OCR and generate the post for one manifest entry.
+
+    task is (position, entry, post slug, OCR text path from prefetch_pdf).
+    Returns the updated entry and its outcome: "processed", "skipped_pages" or "failed".
+    """
+    i, entry, slug, txt_path = task
+    title = entry.get("Title", "Untitled")
+    pdf_url = entry.get("file_pdf", "")
+
+    log.info("[%d/%d] Processing: %s", i, total, title)
+
+    if not pdf_url:
+        log.warning("  No PDF URL, skipping")
+        entry["blog_page"] = entry.get("blog_page", "")
+        return entry, "failed"
+
+    pdf_path = local_pdf_path(entry)
+    post_path = POSTS_DIR / f"{slug}.html"
+
+    if txt_path is None or not txt_path.exists():
+        # Download PDF
+        if not download_pdf(pdf_url, pdf_path):
+            entry["blog_page"] = entry.get("blog_page", "")
+            return entry, "failed"
+
+        # Without an S3 version or cached text, key on the PDF's bytes
+        if txt_path is None:
+            txt_path = ocr_txt_path(slug, "sha256", pdf_digest(pdf_path))
+
+        # Check page count before OCR
+        if max_pages and not txt_path.exists():
+            pages = get_page_count(pdf_path)
+            if pages > max_pages:
+                log.info("  Skipping: %d pages (limit %d)", pages, max_pages)
+                pdf_path.unlink(missing_ok=True)
+                entry["blog_page"] = entry.get("blog_page", "")
+                return entry, "skipped_pages"
+
+    # OCR the PDF (ocr_pdf reuses txt_path if it exists)
+    ocr_text = ocr_pdf(pdf_path, txt_path, dpi=dpi, page_workers=page_workers)
+
+    # Drop OCR text left over from earlier versions of this PDF
+    if txt_path.exists():
+        for stale in OCR_OUTPUT_DIR.glob(f"{slug}.*.txt"):
+            if stale != txt_path:
+                stale.unlink()
+
+    # Generate blog post HTML
+    post_html = generate_post_html(entry, ocr_text, slug)
+    post_path.write_text(post_html, encoding="utf-8")
+    log.info("  Generated post: %s", post_path.name)
+
+    entry["blog_page"] = f"posts/{slug}.html"
+    return entry, "processed"
+
+
+def raise_open_file_limit(target: int = 10000):
+    """Raise the soft open-file limit, which macOS defaults to 256.
+
+    Rasterised pages stay open as images until OCR'd, so a long PDF can
+    otherwise run out of file descriptors.
+    """
+    if sys.platform != "darwin":
+        return
+    import resource
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < target:
+        new_soft = target if hard == resource.RLIM_INFINITY else min(target, hard)
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (new_soft, hard))
+        except (ValueError, OSError):
+            log.warning("Open file limit is %d; long PDFs may fail (try ulimit -n %d)", soft, target)
+
+
 def main():
     parser = argparse.ArgumentParser(description="Rickover Corpus OCR pipeline")
     parser.add_argument("--max-pages", type=int, default=0,
                         help="Skip PDFs with more than this many pages (0 = no limit)")
     parser.add_argument("--types", nargs="*", default=None,
                         help="Only process these document types (e.g. Speech Memo Interview)")
+    parser.add_argument("--dpi", type=int, default=DEFAULT_DPI,
+                        help=f"Resolution to rasterise pages at for OCR (default {DEFAULT_DPI}; 300 for precise mode)")
     args = parser.parse_args()
 
     OCR_OUTPUT_DIR.mkdir(exist_ok=True)
     POSTS_DIR.mkdir(exist_ok=True)
+    raise_open_file_limit()
 
     # Load manifest
-    with open(MANIFEST_PATH, "r", encoding="utf-8") as f:
-        manifest = json.load(f)
+    manifest = load_manifest(MANIFEST_PATH.read_bytes())
 
     log.info("Loaded manifest with %d entries", len(manifest))
+    # Slug each title once; prefetching, OCR and the blog index all use it
+    slugs = [slugify(entry.get("Title", "Untitled")) for entry in manifest]
     if args.max_pages:
         log.info("Skipping PDFs with more than %d pages", args.max_pages)
     if args.types:
         log.info("Filtering to types: %s", ", ".join(args.types))
 
-    # Track slugs for manifest update
-    updated_manifest = []
+    # Type filtering is cheap, so do it here; everything else runs in the pool
+    updated_manifest = list(manifest)
+    tasks = []
     processed = 0
     skipped_type = 0
     skipped_pages = 0
 
     for i, entry in enumerate(manifest, 1):
-        title = entry.get("Title", "Untitled")
-        pdf_url = entry.get("file_pdf", "")
         doc_type = entry.get("Type", "")
-
-        # Filter by type
         if args.types and doc_type not in args.types:
-            log.info("[%d/%d] Skipping (type %s): %s", i, len(manifest), doc_type, title)
+            log.info("[%d/%d] Skipping (type %s): %s", i, len(manifest), doc_type, entry.get("Title", "Untitled"))
             entry["blog_page"] = entry.get("blog_page", "")
-            updated_manifest.append(entry)
             skipped_type += 1
             continue
-
-        log.info("[%d/%d] Processing: %s", i, len(manifest), title)
-
-        if not pdf_url:
-            log.warning("  No PDF URL, skipping")
-            entry["blog_page"] = entry.get("blog_page", "")
-            updated_manifest.append(entry)
-            continue
-
-        slug = slugify(title)
-
-        # Derive local filename from URL
-        pdf_filename = unquote_plus(pdf_url.split("/")[-1])
-        pdf_path = OCR_OUTPUT_DIR / pdf_filename
-        txt_filename = Path(pdf_filename).stem + ".txt"
-        txt_path = OCR_OUTPUT_DIR / txt_filename
-        post_path = POSTS_DIR / f"{slug}.html"
-
-        # Skip if post already exists and has OCR text
-        if post_path.exists() and txt_path.exists():
-            log.info("  Already processed, skipping")
-            ocr_text = txt_path.read_text(encoding="utf-8")
-        else:
-            # Download PDF
-            if not download_pdf(pdf_url, pdf_path):
-                entry["blog_page"] = entry.get("blog_page", "")
-                updated_manifest.append(entry)
-                continue
-
-            # Check page count before OCR
-            if args.max_pages:
-                pages = get_page_count(pdf_path)
-                if pages > args.max_pages:
-                    log.info("  Skipping: %d pages (limit %d)", pages, args.max_pages)
-                    pdf_path.unlink(missing_ok=True)
-                    entry["blog_page"] = entry.get("blog_page", "")
-                    updated_manifest.append(entry)
-                    skipped_pages += 1
-                    continue
-
-            # OCR the PDF
-            ocr_text = ocr_pdf(pdf_path, txt_path)
-
-        # Generate blog post HTML
-        post_html = generate_post_html(entry, ocr_text, slug)
-        post_path.write_text(post_html, encoding="utf-8")
-        log.info("  Generated post: %s", post_path.name)
-
-        entry["blog_page"] = f"posts/{slug}.html"
-        updated_manifest.append(entry)
-        processed += 1
+        tasks.append((i, entry, slugs[i - 1]))
+
+    # Documents are independent and OCR is CPU-bound, so run one per core.
+    # With fewer documents than cores, the spare cores OCR pages within each
+    # document instead. Keep Tesseract single-threaded to avoid oversubscription,
+    # unless OMP_THREAD_LIMIT is already set in the environment
+    os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+    cpus = os.cpu_count() or 1
+    doc_workers = max(1, min(cpus, len(tasks)))
+    work = partial(process_entry, total=len(manifest), max_pages=args.max_pages, dpi=args.dpi,
+                   page_workers=max(1, cpus // doc_workers))
+
+    # Downloads run ahead in threads and each entry is handed to the OCR pool
+    # once its PDF is on disk, so network time overlaps OCR. Workers are
+    # spawned, not forked, since forking while download threads hold locks
+    # (logging, the session pool) can deadlock the child
+    with ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS) as downloads, \
+            ProcessPoolExecutor(max_workers=doc_workers,
+                                mp_context=multiprocessing.get_context("spawn")) as executor:
+        fetched = [downloads.submit(prefetch_pdf, entry, slug) for _, entry, slug in tasks]
+        futures = [executor.submit(work, task + (fetch.result(),))
+                   for task, fetch in zip(tasks, fetched)]
+
+        for (i, _, _), future in zip(tasks, futures):
+            entry, status = future.result()
+            updated_manifest[i - 1] = entry
+            if status == "processed":
+                processed += 1
+            elif status == "skipped_pages":
+                skipped_pages += 1
 
     # Generate blog index
-    generate_blog_index(updated_manifest)
+    generate_blog_index(updated_manifest, slugs)
 
     # Update manifest with blog_page fields
-    with open(MANIFEST_PATH, "w", encoding="utf-8") as f:
-        json.dump(updated_manifest, f, indent=2, ensure_ascii=False)
+    MANIFEST_PATH.write_bytes(dump_manifest(updated_manifest))
     log.info("Updated manifest.json with blog_page fields")
 
     # Clean up downloaded PDFs to save space (keep OCR text)